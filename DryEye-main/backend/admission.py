@@ -0,0 +1,299 @@
+"""
+Controllo di ammissione delle richieste: rate limiting e limite di concorrenza.
+
+Durante i picchi (campagne di screening) le richieste in eccesso vengono
+respinte subito invece di accodarsi senza limite, così la latenza di chi
+viene servito resta bassa:
+
+- token bucket per IP del client e per chiave API (intestazione X-API-Key):
+  oltre il limite la risposta è 429 con Retry-After pari al tempo necessario
+  a recuperare un gettone. Le chiavi riconosciute sono quelle elencate in
+  ADMISSION_API_KEYS (separate da virgole): una richiesta con chiave
+  riconosciuta consuma solo il bucket della chiave (sulle route che hanno un
+  limite per chiave), così i client dietro lo
+  stesso NAT o proxy non condividono il limite per IP; le altre richieste,
+  anche con una chiave sconosciuta, consumano il bucket dell'IP;
+- limite globale di richieste in esecuzione con una coda di attesa limitata:
+  a coda piena, o dopo ADMISSION_QUEUE_TIMEOUT secondi di attesa, la risposta
+  è 503 con Retry-After. Una route può avere anche un proprio limite.
+
+I limiti si applicano solo alle route in DEFAULT_POLICIES (sottomissioni e
+/risultato); ADMISSION_POLICIES (JSON, percorso -> campi di RoutePolicy)
+modifica o aggiunge route, ad esempio:
+
+    {"/api/questionnaire/submit": {"ip_rate": 50, "ip_burst": 100, "concurrency": 32}}
+
+Un rate 0 disattiva il bucket corrispondente, ADMISSION_MAX_CONCURRENCY=0 il
+limite globale. Gli stati sono per processo:
+con più worker gunicorn il limite effettivo è moltiplicato per i worker.
+Dietro nginx l'IP del client è letto da ADMISSION_CLIENT_IP_HEADER
+(X-Real-IP, impostato da entrypoint.sh); ADMISSION_ENABLED=0 disattiva tutto.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, FrozenSet, Optional
+
+API_KEY_HEADER = b"x-api-key"
+
+
+class TokenBucket:
+    """Bucket di `burst` gettoni ricaricato a `rate` gettoni al secondo"""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, rate: float, burst: float, now: float) -> float:
+        """Consuma un gettone; 0 se concesso, altrimenti i secondi da attendere"""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+class RateLimiter:
+    """Un TokenBucket per chiave, con al massimo `max_keys` chiavi (LRU)"""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.rejected = 0
+
+    def check(self, key: str, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.burst, now)
+            # Un bucket scartato ricomincerebbe pieno: al più si concede un burst in più
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        retry_after = bucket.take(self.rate, self.burst, now)
+        if retry_after:
+            self.rejected += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, object]:
+        return {"rate": self.rate, "burst": self.burst, "keys": len(self._buckets), "rejected": self.rejected}
+
+
+class ConcurrencyLimiter:
+    """Al massimo `limit` richieste in esecuzione e `queue_size` in attesa di un posto"""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self) -> bool:
+        """True se la richiesta può procedere; False se va respinta"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            # Il posto era già stato ceduto a questa richiesta: va restituito
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        return True
+
+    def release(self) -> None:
+        """Cede il posto alla prima richiesta in attesa, altrimenti lo libera"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class RoutePolicy:
+    """Limiti di una route; rate in richieste al secondo, 0 = nessun limite"""
+
+    def __init__(self, ip_rate: float = 0, ip_burst: float = 0, key_rate: float = 0, key_burst: float = 0,
+                 concurrency: int = 0, queue: int = 0):
+        self.ip = RateLimiter(ip_rate, ip_burst or ip_rate) if ip_rate else None
+        self.key = RateLimiter(key_rate, key_burst or key_rate) if key_rate else None
+        self.concurrency = concurrency
+        self.queue = queue
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "ip": self.ip.stats() if self.ip else None,
+            "key": self.key.stats() if self.key else None,
+        }
+
+
+# Limiti predefiniti per route (percorso esatto); un batch o uno stream vale
+# molte sottomissioni, quindi ha un rate più basso e un proprio limite di concorrenza
+DEFAULT_POLICIES = {
+    "/api/questionnaire/submit": {"ip_rate": 20, "ip_burst": 40, "key_rate": 200, "key_burst": 400},
+    "/api/questionnaire/submit/batch": {"ip_rate": 1, "ip_burst": 5, "key_rate": 10, "key_burst": 20,
+                                        "concurrency": 4, "queue": 8},
+    "/api/questionnaire/submit/stream": {"ip_rate": 0.2, "ip_burst": 2, "key_rate": 1, "key_burst": 4,
+                                         "concurrency": 2, "queue": 0},
+    "/risultato": {"ip_rate": 5, "ip_burst": 10},
+}
+
+
+class AdmissionController:
+    """Politiche per route più il limite globale di concorrenza"""
+
+    def __init__(self, policies: Dict[str, RoutePolicy], concurrency: int, queue: int, queue_timeout: float,
+                 client_ip_header: Optional[str] = None, api_keys: FrozenSet[str] = frozenset()):
+        self.policies = policies
+        self.api_keys = api_keys
+        self.queue_timeout = queue_timeout
+        self.client_ip_header = client_ip_header.lower().encode() if client_ip_header else None
+        self.global_limiter = ConcurrencyLimiter(concurrency, queue, queue_timeout) if concurrency else None
+        self.route_limiters = {
+            path: ConcurrencyLimiter(policy.concurrency, policy.queue, queue_timeout)
+            for path, policy in policies.items() if policy.concurrency
+        }
+
+    def client_ip(self, scope) -> str:
+        if self.client_ip_header is not None:
+            for name, value in scope["headers"]:
+                if name == self.client_ip_header:
+                    return value.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else ""
+
+    def api_key(self, scope) -> Optional[str]:
+        """Chiave API della richiesta, se è tra quelle riconosciute"""
+        for name, value in scope["headers"]:
+            if name == API_KEY_HEADER:
+                key = value.decode("latin-1")
+                return key if key in self.api_keys else None
+        return None
+
+    def check_rate(self, policy: RoutePolicy, scope) -> float:
+        """0 se la richiesta rientra nei limiti, altrimenti i secondi per Retry-After"""
+        # Ogni richiesta consuma un solo bucket: quello della chiave riconosciuta
+        # (se la route ha un limite per chiave) oppure quello dell'IP, quindi un
+        # rifiuto non spende il gettone dell'altro
+        now = time.monotonic()
+        key = self.api_key(scope) if policy.key is not None else None
+        if key is not None:
+            return policy.key.check(key, now)
+        if policy.ip is not None:
+            return policy.ip.check(self.client_ip(scope), now)
+        return 0.0
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "global": self.global_limiter.stats() if self.global_limiter else None,
+            "routes": {
+                path: {**policy.stats(),
+                       "concurrency": self.route_limiters[path].stats() if path in self.route_limiters else None}
+                for path, policy in self.policies.items()
+            },
+        }
+
+
+def admission_from_env() -> Optional[AdmissionController]:
+    """AdmissionController da ADMISSION_*; None con ADMISSION_ENABLED=0"""
+    if os.environ.get("ADMISSION_ENABLED", "1") != "1":
+        return None
+    settings = {path: dict(fields) for path, fields in DEFAULT_POLICIES.items()}
+    for path, fields in json.loads(os.environ.get("ADMISSION_POLICIES", "{}")).items():
+        settings[path] = {**settings.get(path, {}), **fields}
+    return AdmissionController(
+        {path: RoutePolicy(**fields) for path, fields in settings.items()},
+        concurrency=int(os.environ.get("ADMISSION_MAX_CONCURRENCY", "64")),
+        queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "128")),
+        queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "1.0")),
+        client_ip_header=os.environ.get("ADMISSION_CLIENT_IP_HEADER") or None,
+        api_keys=frozenset(filter(None, (key.strip() for key in os.environ.get("ADMISSION_API_KEYS", "").split(",")))),
+    )
+
+
+def _retry_after(seconds: float) -> bytes:
+    return str(max(1, math.ceil(seconds))).encode()
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", _retry_after(retry_after)),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI che applica l'AdmissionController alle route con una politica"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        policy = self.controller.policies.get(scope["path"]) if scope["type"] == "http" else None
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.controller.check_rate(policy, scope)
+        if retry_after:
+            await _reject(send, 429, "Troppe richieste, riprova tra poco.", retry_after)
+            return
+
+        # Prima il limite della route, poi quello globale: un batch in attesa
+        # del proprio posto non occupa un posto globale
+        limiters = [self.controller.route_limiters.get(scope["path"]), self.controller.global_limiter]
+        acquired = []
+        try:
+            for limiter in filter(None, limiters):
+                if not await limiter.acquire():
+                    await _reject(send, 503, "Servizio temporaneamente sovraccarico, riprova tra poco.",
+                                  self.controller.queue_timeout)
+                    return
+                acquired.append(limiter)
+            await self.app(scope, receive, send)
+        finally:
+            for limiter in acquired:
+                limiter.release()
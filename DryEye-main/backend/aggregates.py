@@ -0,0 +1,199 @@
+"""
+Statistiche aggregate delle sottomissioni, mantenute in memoria.
+
+Ogni sottomissione aggiorna un numero fisso di contatori (tipo di risultato,
+istogramma di ciascun punteggio pubblico, frequenza di ogni risposta alle 20
+domande), quindi sia l'aggiornamento sia la lettura hanno costo costante e
+nessuno deve scorrere le sottomissioni archiviate.
+
+Con AGGREGATES_SNAPSHOT_PATH i contatori sono caricati all'avvio e salvati
+periodicamente (AGGREGATES_SNAPSHOT_INTERVAL secondi, predefinito 10) e allo
+spegnimento. I contatori sono per processo: con più worker gunicorn ogni
+worker usa il file del proprio slot ("{worker}" nel percorso è sostituito da
+WORKER_SLOT, assegnato da backend/gunicorn_conf.py e stabile tra i riavvii
+del worker), quindi un worker riciclato riprende i contatori del precedente.
+La lettura (merged) somma i contatori in memoria del worker con gli snapshot
+degli altri slot, aggiornati al più a un intervallo di salvataggio fa.
+"""
+import asyncio
+import glob
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from backend.answers import QUESTION_COUNT
+from backend.rules import PUBLIC_SCORES, RESULT_TYPES, SCALE_QUESTIONS, SCORE_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+_TYPE_INDEX = {result_type: index for index, result_type in enumerate(RESULT_TYPES)}
+
+
+def max_score(weights: Dict[int, int]) -> int:
+    """Punteggio massimo: risposta 4 alle domande scala, "si" alle domande sì/no"""
+    return sum(weight * (4 if q in SCALE_QUESTIONS else 1) for q, weight in weights.items())
+
+
+# Valori possibili per punteggio pubblico e per risposta (scala 0-4, sì/no 0-1)
+SCORE_RANGES = {name: max_score(SCORE_WEIGHTS[name]) + 1 for name in PUBLIC_SCORES}
+ANSWER_VALUES = tuple(
+    ("0", "1", "2", "3", "4") if q in SCALE_QUESTIONS else ("no", "si") for q in range(1, QUESTION_COUNT + 1)
+)
+
+
+class AggregateStats:
+    """Contatori di tipo, punteggi e risposte aggiornati in O(1) per sottomissione"""
+
+    def __init__(self):
+        self.total = 0
+        self.types = [0] * len(RESULT_TYPES)
+        self.scores = {name: [0] * size for name, size in SCORE_RANGES.items()}
+        self.answers = [[0] * len(values) for values in ANSWER_VALUES]
+        self.since = datetime.now(timezone.utc).isoformat()
+
+    def record(self, vector: Tuple[int, ...], result_type: str, scores: Dict[str, int]) -> None:
+        self.total += 1
+        self.types[_TYPE_INDEX[result_type]] += 1
+        for name, histogram in self.scores.items():
+            histogram[scores[name]] += 1
+        for counts, value in zip(self.answers, vector):
+            counts[value] += 1
+
+    def snapshot(self) -> Dict:
+        """Contatori in forma JSON (dimensione fissa, indipendente dal numero di sottomissioni)"""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "since": self.since,
+            "total": self.total,
+            "types": dict(zip(RESULT_TYPES, self.types)),
+            "scores": {name: _histogram(histogram) for name, histogram in self.scores.items()},
+            "answers": {
+                str(q): dict(zip(values, counts))
+                for q, values, counts in zip(range(1, QUESTION_COUNT + 1), ANSWER_VALUES, self.answers)
+            },
+        }
+
+    def restore(self, snapshot: Dict) -> None:
+        """Ripristina i contatori da snapshot(); tipi o valori sconosciuti sono ignorati"""
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Versione dello snapshot non supportata: {snapshot.get('version')}")
+        self.since = snapshot["since"]
+        self.total = snapshot["total"]
+        self.types = [snapshot["types"].get(t, 0) for t in RESULT_TYPES]
+        for name, histogram in self.scores.items():
+            saved = snapshot["scores"].get(name, {})
+            for value in range(len(histogram)):
+                histogram[value] = saved.get(str(value), 0)
+        for q, values, counts in zip(range(1, QUESTION_COUNT + 1), ANSWER_VALUES, self.answers):
+            saved = snapshot["answers"].get(str(q), {})
+            counts[:] = [saved.get(value, 0) for value in values]
+
+    def add(self, snapshot: Dict) -> None:
+        """Somma ai contatori quelli di uno snapshot (ad esempio di un altro worker)"""
+        other = AggregateStats()
+        other.restore(snapshot)
+        self.since = min(self.since, other.since)
+        self.total += other.total
+        self.types = [a + b for a, b in zip(self.types, other.types)]
+        for name, histogram in self.scores.items():
+            histogram[:] = [a + b for a, b in zip(histogram, other.scores[name])]
+        for counts, other_counts in zip(self.answers, other.answers):
+            counts[:] = [a + b for a, b in zip(counts, other_counts)]
+
+    def save(self, path: str) -> None:
+        write_snapshot(path, self.snapshot())
+
+    def load(self, path: str) -> bool:
+        """Carica lo snapshot se esiste; False se il file manca"""
+        try:
+            with open(path) as f:
+                self.restore(json.load(f))
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def _histogram(counts: List[int]) -> Dict[str, int]:
+    return {str(value): count for value, count in enumerate(counts)}
+
+
+def write_snapshot(path: str, snapshot: Dict) -> None:
+    """Scrittura atomica dello snapshot (file temporaneo + rename)"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+class SnapshotTask:
+    """Salvataggio periodico di AggregateStats in un task di background"""
+
+    def __init__(self, stats: AggregateStats, path_template: str, slot: str = "0", interval: float = 10.0):
+        self.stats = stats
+        self.path = path_template.replace("{worker}", slot)
+        # Snapshot di tutti gli slot, compreso quello di questo worker
+        self.pattern = glob.escape(path_template).replace(glob.escape("{worker}"), "*")
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if await asyncio.to_thread(self.stats.load, self.path):
+            logger.info("Statistiche aggregate caricate da %s (%d sottomissioni)", self.path, self.stats.total)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._save()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._save()
+
+    async def _save(self) -> None:
+        # I contatori sono letti nel loop, dove vengono aggiornati; solo la scrittura va nel thread
+        snapshot = self.stats.snapshot()
+        try:
+            await asyncio.to_thread(write_snapshot, self.path, snapshot)
+        except OSError:
+            logger.exception("Salvataggio delle statistiche aggregate in %s fallito", self.path)
+
+    async def merged(self) -> Dict:
+        """Contatori di tutti i worker: quelli in memoria più gli snapshot degli altri slot"""
+        own = self.stats.snapshot()
+        return await asyncio.to_thread(self._merge_files, own)
+
+    def _merge_files(self, own: Dict) -> Dict:
+        total = AggregateStats()
+        total.restore(own)
+        workers = 1
+        for path in sorted(glob.glob(self.pattern)):
+            if os.path.abspath(path) == os.path.abspath(self.path) or path.endswith(".tmp"):
+                continue
+            try:
+                with open(path) as f:
+                    total.add(json.load(f))
+            except (OSError, ValueError):
+                logger.warning("Snapshot delle statistiche aggregate %s non leggibile", path, exc_info=True)
+                continue
+            workers += 1
+        return {**total.snapshot(), "workers": workers}
+
+
+def snapshot_task_from_env(stats: AggregateStats) -> Optional[SnapshotTask]:
+    """SnapshotTask da AGGREGATES_SNAPSHOT_PATH / _INTERVAL e WORKER_SLOT; None se non configurato"""
+    path = os.environ.get("AGGREGATES_SNAPSHOT_PATH")
+    if not path:
+        return None
+    interval = float(os.environ.get("AGGREGATES_SNAPSHOT_INTERVAL", "10"))
+    return SnapshotTask(stats, path, os.environ.get("WORKER_SLOT", "0"), interval)
@@ -0,0 +1,45 @@
+"""
+Modello tipizzato delle risposte al questionario.
+
+Le 20 risposte sono validate in un solo passaggio da pydantic-core: chiavi
+fisse "1".."20" (nessuna mancante, nessuna in più), valori "0"-"4" per le
+domande scala 1-7 e "si"/"no" per le domande 8-20. Il risultato è un vettore
+di 20 interi (scala 0-4, sì = 1, no = 0) indicizzato per domanda - 1, che il
+classificatore usa senza dover riconvertire stringhe.
+"""
+from typing import Dict, Literal, Tuple
+
+from pydantic import AfterValidator, ConfigDict
+from typing_extensions import Annotated, TypedDict
+
+from backend.rules import SCALE_QUESTIONS
+
+QUESTION_COUNT = 20
+
+ScaleAnswer = Literal["0", "1", "2", "3", "4"]
+YesNoAnswer = Literal["si", "no"]
+
+AnswerSet = TypedDict(
+    "AnswerSet",
+    {str(q): ScaleAnswer if q in SCALE_QUESTIONS else YesNoAnswer for q in range(1, QUESTION_COUNT + 1)},
+)
+AnswerSet.__pydantic_config__ = ConfigDict(extra="forbid")
+
+_KEYS = tuple(str(q) for q in range(1, QUESTION_COUNT + 1))
+_VALUES = {"0": 0, "1": 1, "2": 2, "3": 3, "4": 4, "si": 1, "no": 0}
+
+
+def answers_to_vector(answers: Dict[str, str]) -> Tuple[int, ...]:
+    """Vettore di 20 interi da un dizionario di risposte già validato"""
+    return tuple([_VALUES[answers[key]] for key in _KEYS])
+
+
+def vector_to_answers(vector: Tuple[int, ...]) -> Dict[str, str]:
+    """Dizionario di risposte canonico ("0"-"4", "si"/"no") dal vettore"""
+    return {
+        key: str(value) if q in SCALE_QUESTIONS else ("si" if value else "no")
+        for q, key, value in zip(range(1, QUESTION_COUNT + 1), _KEYS, vector)
+    }
+
+
+AnswerVector = Annotated[AnswerSet, AfterValidator(answers_to_vector)]
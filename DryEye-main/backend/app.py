@@ -0,0 +1,50 @@
+"""
+Applicazione unica: API JSON (backend/server.py) e pagine HTML del
+questionario (backend/forms.py) servite dallo stesso processo, con un solo
+motore di classificazione.
+
+Avvio: `uvicorn backend.app:app` oppure gunicorn con backend/gunicorn_conf.py.
+"""
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from backend import forms, server
+from backend.admission import AdmissionMiddleware
+from backend.fast_json import FastJSONResponse
+from backend.metrics import MetricsMiddleware
+
+
+def create_app() -> FastAPI:
+    """Costruisce l'applicazione con middleware, API e pagine HTML"""
+    app = FastAPI(
+        title="Dry Eye Questionnaire API",
+        version="1.0.0",
+        default_response_class=FastJSONResponse,
+    )
+
+    # Il più interno: le risposte 429/503 passano comunque da CORS e metriche
+    if server.admission_controller is not None:
+        app.add_middleware(AdmissionMiddleware, controller=server.admission_controller)
+
+    # CORS middleware configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, replace with specific origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(MetricsMiddleware)
+
+    # Gli eventi di startup/shutdown dell'API (archiviazione, readiness) sono
+    # registrati sul router e inclusi qui
+    app.include_router(server.router)
+    app.include_router(forms.router, include_in_schema=False)
+    return app
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8001)
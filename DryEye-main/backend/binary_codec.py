@@ -0,0 +1,92 @@
+"""
+Codifica binaria compatta per /api/questionnaire/submit e /submit/batch.
+
+Richiesta (Content-Type: application/vnd.dryeye.answers): 20 byte per
+questionario, un byte per domanda nell'ordine 1-20; domande 1-7 valore 0-4,
+domande 8-20 1 = sì, 0 = no. Un batch è la concatenazione di N record.
+
+Risposta (Accept: application/vnd.dryeye.result): 4 byte per questionario,
+[indice tipo (RESULT_TYPES), punteggio evaporativo, punteggio acquoso,
+sintomi totali]; nel batch un record non valido ha indice 255 e punteggi 0.
+
+Il JSON resta il formato predefinito: la codifica binaria si usa solo se
+richiesta esplicitamente tramite Content-Type / Accept (con qualità maggiore
+di 0 e non inferiore a quella del JSON; a parità vince il JSON solo se è
+nominato esplicitamente).
+"""
+from typing import Dict, List, Optional, Tuple
+
+from backend.answers import QUESTION_COUNT
+from backend.rules import PUBLIC_SCORES, RESULT_TYPES, SCALE_QUESTIONS
+
+ANSWERS_MEDIA_TYPE = "application/vnd.dryeye.answers"
+RESULT_MEDIA_TYPE = "application/vnd.dryeye.result"
+
+RECORD_SIZE = QUESTION_COUNT
+RESULT_SIZE = 1 + len(PUBLIC_SCORES)
+ERROR_INDEX = 255
+
+_SCALE_COUNT = len(SCALE_QUESTIONS)
+_TYPE_INDEX = {result_type: index for index, result_type in enumerate(RESULT_TYPES)}
+_ERROR_RECORD = bytes([ERROR_INDEX] + [0] * len(PUBLIC_SCORES))
+
+
+def is_binary_request(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";", 1)[0].strip().lower() == ANSWERS_MEDIA_TYPE
+
+
+def _media_ranges(header: str) -> Dict[str, float]:
+    """Interpreta Accept in un dizionario media range -> qualità"""
+    ranges = {}
+    for part in header.split(","):
+        media_range, *params = part.split(";")
+        media_range = media_range.strip().lower()
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_range] = quality
+    return ranges
+
+
+def wants_binary_response(accept: Optional[str]) -> bool:
+    """Vero se Accept nomina la codifica binaria e la preferisce al JSON"""
+    if not accept:
+        return False
+    ranges = _media_ranges(accept)
+    binary = ranges.get(RESULT_MEDIA_TYPE, 0.0)
+    if binary <= 0:
+        return False
+    if "application/json" in ranges:
+        return binary > ranges["application/json"]
+    return binary >= ranges.get("application/*", ranges.get("*/*", 0.0))
+
+
+def decode_record(record: bytes) -> Optional[Tuple[int, ...]]:
+    """Vettore di risposte da un record di 20 byte; None se un valore è fuori intervallo"""
+    if max(record[:_SCALE_COUNT]) > 4 or max(record[_SCALE_COUNT:]) > 1:
+        return None
+    return tuple(record)
+
+
+def decode_answers(body: bytes) -> List[Optional[Tuple[int, ...]]]:
+    """Record del corpo binario; solleva ValueError se la lunghezza non è un multiplo di 20"""
+    if not body or len(body) % RECORD_SIZE:
+        raise ValueError(f"Il corpo deve contenere record da {RECORD_SIZE} byte")
+    return [decode_record(body[i:i + RECORD_SIZE]) for i in range(0, len(body), RECORD_SIZE)]
+
+
+def encode_result(result) -> bytes:
+    """Record di 4 byte per un QuestionnaireResult"""
+    scores = result.scores
+    return bytes([_TYPE_INDEX[result.type], *(scores[name] for name in PUBLIC_SCORES)])
+
+
+def encode_error() -> bytes:
+    return _ERROR_RECORD
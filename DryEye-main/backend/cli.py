@@ -0,0 +1,208 @@
+"""
+Punteggio offline di esportazioni CSV/Parquet dei questionari.
+
+Il file viene letto a blocchi (`--chunk-size` righe), quindi la memoria usata
+non dipende dalla dimensione del file; ogni blocco è classificato in un pool
+di processi con il motore vettoriale (backend/vectorized.py), che applica le
+stesse regole di `classify_dry_eye`. I risultati sono scritti nello stesso
+ordine dell'input, blocco per blocco.
+
+Le colonne delle risposte si chiamano "1".."20" (oppure "q1".."q20" con
+--column-prefix q), con valori "0"-"4" per le domande 1-7 e "si"/"no" per le
+domande 8-20; una cella vuota equivale a una risposta mancante. Il file deve
+contenere tutte e 20 le colonne: se ne manca una il comando termina subito con
+errore, prima di scrivere risultati. Il Parquet richiede pyarrow.
+
+Esempio (dalla cartella DryEye-main):
+    python -m backend.cli export.csv --output risultati.csv --workers 4
+"""
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import typer
+
+from backend.external_integrations import optional_import
+from backend.rules import PUBLIC_SCORES, RESULT_TYPES, SCALE_QUESTIONS
+from backend.vectorized import QUESTION_COUNT, YESNO_QUESTIONS, score_matrix
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+app = typer.Typer(add_completion=False)
+
+
+def is_parquet(path: str) -> bool:
+    return path.lower().endswith(PARQUET_SUFFIXES)
+
+
+def _pyarrow():
+    """pyarrow e pyarrow.parquet, importati solo per i file Parquet"""
+    pa, pq = optional_import("pyarrow"), optional_import("pyarrow.parquet")
+    if pq is None:
+        raise typer.BadParameter("Per i file Parquet è necessario installare pyarrow")
+    return pa, pq
+
+
+def read_header(path: str) -> List[str]:
+    """Nomi delle colonne del file, senza leggerne le righe"""
+    if is_parquet(path):
+        _, pq = _pyarrow()
+        return list(pq.ParquetFile(path).schema_arrow.names)
+    return list(pd.read_csv(path, dtype=str, nrows=0).columns)
+
+
+def check_columns(path: str, columns: List[str]) -> None:
+    """BadParameter se manca una delle colonne attese: nessuna risposta viene sostituita da un default"""
+    present = set(read_header(path))
+    missing = [c for c in columns if c not in present]
+    if missing:
+        raise typer.BadParameter(
+            f"Colonne mancanti in {path}: {', '.join(missing)} (controllare --column-prefix / --id-column)"
+        )
+
+
+def read_chunks(path: str, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Blocchi di righe del file con le sole colonne richieste, come stringhe"""
+    if is_parquet(path):
+        pa, pq = _pyarrow()
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+            table = pa.Table.from_batches([batch])
+            table = table.cast(pa.schema([(name, pa.string()) for name in table.column_names]))
+            yield table.to_pandas().fillna("")
+    else:
+        wanted = set(columns)
+        yield from pd.read_csv(
+            path,
+            dtype=str,
+            keep_default_na=False,
+            usecols=lambda c: c in wanted,
+            chunksize=chunk_size,
+        )
+
+
+def score_frame(frame: pd.DataFrame, prefix: str = "", id_column: Optional[str] = None,
+                first_row: int = 0) -> pd.DataFrame:
+    """
+    Classifica un blocco di righe: tipo, punteggi pubblici ed eventuale errore.
+
+    Come in `classify_dry_eye` una risposta scala deve essere un intero
+    (altrimenti la riga è segnata come non valida) e una domanda sì/no vale
+    1 solo con "si".
+    """
+    rows = len(frame)
+    matrix = np.zeros((rows, QUESTION_COUNT), dtype=np.int64)
+    invalid = np.zeros(rows, dtype=bool)
+    for q in SCALE_QUESTIONS:
+        text = frame[f"{prefix}{q}"].astype(str).str.strip()
+        text = text.where(text != "", "0")
+        numeric = text.str.fullmatch(r"[+-]?\d+").to_numpy(dtype=bool)
+        invalid |= ~numeric
+        matrix[:, q - 1] = np.where(numeric, pd.to_numeric(text.where(numeric, "0")), 0)
+    for q in YESNO_QUESTIONS:
+        matrix[:, q - 1] = (frame[f"{prefix}{q}"].astype(str).str.strip() == "si").to_numpy()
+
+    evaporative, aqueous, total, type_index = score_matrix(matrix)
+    result = pd.DataFrame({"row": np.arange(first_row, first_row + rows)})
+    if id_column is not None:
+        result[id_column] = frame[id_column].to_numpy()
+    result["type"] = np.where(invalid, "", np.asarray(RESULT_TYPES, dtype=object)[type_index])
+    for name, values in zip(PUBLIC_SCORES, (evaporative, aqueous, total)):
+        result[name] = pd.array(values, dtype="Int64")
+        result.loc[invalid, name] = pd.NA
+    result["error"] = np.where(invalid, "Risposta scala non numerica", "")
+    return result
+
+
+class ResultWriter:
+    """Scrittura incrementale dei risultati in CSV o Parquet"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._parquet = None
+        self._header = True
+        if is_parquet(path):
+            _pyarrow()
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if is_parquet(self.path):
+            pa, pq = _pyarrow()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="a", header=self._header, index=False)
+            self._header = False
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def _progress(rows: int, started: float, final: bool = False) -> None:
+    elapsed = max(time.monotonic() - started, 1e-9)
+    typer.echo(f"\r{rows} righe  {rows / elapsed:,.0f} righe/s", err=True, nl=final)
+
+
+@app.command()
+def score(
+    input_path: str = typer.Argument(..., help="file CSV o Parquet da classificare"),
+    output: str = typer.Option(..., "--output", "-o", help="file dei risultati (.csv o .parquet)"),
+    chunk_size: int = typer.Option(100_000, help="righe lette ed elaborate per blocco"),
+    workers: int = typer.Option(os.cpu_count() or 1, help="processi di classificazione"),
+    column_prefix: str = typer.Option("", help='prefisso delle colonne risposta (es. "q" per q1..q20)'),
+    id_column: Optional[str] = typer.Option(None, help="colonna identificativa da riportare nei risultati"),
+) -> None:
+    """Classifica ogni riga del file e scrive tipo e punteggi"""
+    columns = [f"{column_prefix}{q}" for q in range(1, QUESTION_COUNT + 1)]
+    if id_column:
+        columns.append(id_column)
+    check_columns(input_path, columns)
+
+    writer = ResultWriter(output)
+    started = time.monotonic()
+    rows = 0
+    invalid = 0
+
+    def collect(frame: pd.DataFrame) -> None:
+        nonlocal rows, invalid
+        writer.write(frame)
+        rows += len(frame)
+        invalid += int((frame["error"] != "").sum())
+        _progress(rows, started)
+
+    try:
+        chunks = read_chunks(input_path, columns, chunk_size)
+        if workers <= 1:
+            for chunk in chunks:
+                collect(score_frame(chunk, column_prefix, id_column, rows))
+        else:
+            # Al massimo 2 blocchi in attesa per processo: la lettura non
+            # anticipa l'intero file quando la classificazione è più lenta
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: Deque[Future] = deque()
+                offset = 0
+                for chunk in chunks:
+                    pending.append(pool.submit(score_frame, chunk, column_prefix, id_column, offset))
+                    offset += len(chunk)
+                    if len(pending) >= workers * 2:
+                        collect(pending.popleft().result())
+                while pending:
+                    collect(pending.popleft().result())
+    finally:
+        writer.close()
+
+    _progress(rows, started, final=True)
+    typer.echo(f"Risultati scritti in {output} ({invalid} righe non valide)", err=True)
+
+
+if __name__ == "__main__":
+    sys.exit(app())
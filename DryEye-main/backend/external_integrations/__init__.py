@@ -0,0 +1,34 @@
+"""
+Integrazioni opzionali con pacchetti esterni (pymongo, pyarrow, ...).
+
+I moduli sono importati solo al primo uso, non all'avvio del backend: chi non
+usa l'integrazione non ne paga il tempo di import e il pacchetto può mancare
+dall'immagine (backend/requirements-runtime.txt contiene solo il necessario).
+"""
+import importlib
+from types import ModuleType
+from typing import Dict, Optional
+
+_MISSING = object()
+_modules: Dict[str, object] = {}
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Modulo `name` importato al primo uso; None se il pacchetto non è installato"""
+    module = _modules.get(name)
+    if module is None:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            module = _MISSING
+        _modules[name] = module
+    return None if module is _MISSING else module
+
+
+def require(name: str, feature: str) -> ModuleType:
+    """Come optional_import, ma solleva RuntimeError se il pacchetto manca"""
+    module = optional_import(name)
+    if module is None:
+        package = name.split(".")[0]
+        raise RuntimeError(f"{feature} richiede il pacchetto {package} (pip install {package})")
+    return module
@@ -0,0 +1,59 @@
+"""
+Serializzazione JSON veloce delle risposte dell'API.
+
+FastJSONResponse è la classe di risposta predefinita dell'applicazione
+(backend/app.py) e viene restituita direttamente dalle route che producono
+dizionari o modelli, così FastAPI non passa da jsonable_encoder + json.dumps:
+
+- i modelli Pydantic (QuestionnaireResult, BatchResult, ...) sono serializzati
+  in bytes dal loro serializer compilato, senza dizionari intermedi;
+- gli altri contenuti da orjson, se installato, altrimenti da
+  pydantic_core.to_json (sempre disponibile con Pydantic 2).
+
+L'output è JSON compatto UTF-8, equivalente a quello dei payload statici
+(backend/precompressed.py). FAST_JSON_ENABLED=0 ripristina il percorso
+predefinito di FastAPI, utile per confronti (benchmarks/json_routes.py).
+"""
+import json
+import os
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from backend.external_integrations import optional_import
+
+ENABLED = os.environ.get("FAST_JSON_ENABLED", "1") == "1"
+
+orjson = optional_import("orjson") if ENABLED else None
+
+
+def _default(value):
+    """Tipi non nativi per orjson (modelli annidati in dizionari o liste, sottoclassi di float)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    # numpy.float64 è una sottoclasse di float: json.dumps la accetta, orjson no
+    if isinstance(value, float):
+        return float(value)
+    raise TypeError(f"Tipo non serializzabile in JSON: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    """Contenuto della risposta in bytes JSON compatti"""
+    if not ENABLED:
+        return json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse che serializza con dumps()"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,162 @@
+"""
+Questionario completo renderizzato lato server, per i dispositivi (chioschi,
+connessioni lente) dove il bundle React è troppo pesante.
+
+I template in backend/templates sono letti e compilati (string.Template) una
+sola volta all'import. La home e la pagina con le 20 domande di
+`get_questions` sono pre-renderizzate all'avvio e servite con ETag e varianti
+compresse come i contenuti statici dell'API; per /risultato si sostituiscono
+solo i valori nel frammento già pronto del tipo di risultato. Le risposte
+sono validate, classificate, conteggiate e archiviate dallo stesso percorso
+di /api/questionnaire/submit.
+"""
+import html
+import os
+from string import Template
+from typing import Dict, List
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import HTMLResponse
+from pydantic import TypeAdapter, ValidationError
+
+from backend.answers import AnswerVector
+from backend.precompressed import PrecompressedPayload
+from backend.rules import RESULT_DEFINITIONS, RESULT_KEYS
+from backend.server import (
+    QUESTIONNAIRE_INFO_PAYLOAD,
+    QUESTIONS_PAYLOAD,
+    STATIC_CACHE_MAX_AGE,
+    classify_submission,
+    record_result,
+    shared_cache,
+    store_submission,
+)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+
+router = APIRouter()
+
+
+def load_template(name: str) -> Template:
+    with open(os.path.join(TEMPLATE_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+_TEMPLATES = {
+    name: load_template(f"{name}.html")
+    for name in ("layout", "home", "questionario", "section", "risultato", "errore", "occupato")
+}
+
+
+def render(name: str, page_title: str, **values: str) -> str:
+    """Pagina completa: il template `name` dentro il layout comune"""
+    content = _TEMPLATES[name].substitute(values)
+    return _TEMPLATES["layout"].substitute(title=html.escape(page_title), content=content)
+
+
+def _render_question(question: Dict) -> str:
+    options = ("0", "1", "2", "3", "4") if question["type"] == "scale" else ("si", "no")
+    labels = {"si": "Sì", "no": "No"}
+    name = str(question["id"])
+    inputs = "".join(
+        f'<label><input type="radio" name="{name}" value="{value}" required> {labels.get(value, value)}</label>'
+        for value in options
+    )
+    return f'<p class="q">{question["id"]}. {html.escape(question["text"])}</p>\n{inputs}'
+
+
+def render_questionnaire() -> str:
+    sections = "\n".join(
+        _TEMPLATES["section"].substitute(
+            title=html.escape(section["title"]),
+            description=html.escape(section["description"]),
+            questions="\n".join(_render_question(q) for q in section["questions"]),
+        )
+        for section in QUESTIONS_PAYLOAD["sections"]
+    )
+    return render(
+        "questionario",
+        QUESTIONNAIRE_INFO_PAYLOAD["title"],
+        title=html.escape(QUESTIONNAIRE_INFO_PAYLOAD["title"]),
+        sections=sections,
+        disclaimer=html.escape(QUESTIONNAIRE_INFO_PAYLOAD["disclaimer"]),
+    )
+
+
+def render_home() -> str:
+    info = QUESTIONNAIRE_INFO_PAYLOAD
+    return render(
+        "home",
+        info["title"],
+        description=html.escape(info["description"]),
+        total_questions=str(info["total_questions"]),
+        estimated_time=html.escape(info["estimated_time"]),
+    )
+
+
+def _literal(text: str) -> str:
+    """Testo escapato per l'HTML e per un secondo passaggio di Template"""
+    return html.escape(text).replace("$", "$$")
+
+
+def _result_template(definition: Dict) -> Template:
+    """Pagina del risultato con i testi già inseriti; restano da sostituire i punteggi"""
+    page = render(
+        "risultato",
+        "Risultato",
+        type=_literal(definition["type"]),
+        description=_literal(definition["description"]),
+        recommendations="\n".join(f"<li>{_literal(r)}</li>" for r in definition["recommendations"]),
+        evaporativeScore="$evaporativeScore",
+        aqueousScore="$aqueousScore",
+        totalSymptoms="$totalSymptoms",
+        disclaimer=_literal(QUESTIONNAIRE_INFO_PAYLOAD["disclaimer"]),
+    )
+    return Template(page)
+
+
+_home_page = PrecompressedPayload(render_home().encode(), STATIC_CACHE_MAX_AGE, HTML_MEDIA_TYPE, shared_cache)
+_questionnaire_page = PrecompressedPayload(
+    render_questionnaire().encode(), STATIC_CACHE_MAX_AGE, HTML_MEDIA_TYPE, shared_cache
+)
+_RESULT_PAGES = {
+    RESULT_DEFINITIONS[key]["type"]: _result_template(RESULT_DEFINITIONS[key]) for key in RESULT_KEYS
+}
+
+_answers = TypeAdapter(AnswerVector)
+
+
+def _invalid_questions(error: ValidationError) -> List[str]:
+    return sorted({str(e["loc"][0]) for e in error.errors() if e["loc"]}, key=int)
+
+
+@router.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    return _home_page.response(request)
+
+@router.get("/questionario", response_class=HTMLResponse)
+async def questionario(request: Request):
+    return _questionnaire_page.response(request)
+
+@router.post("/risultato", response_class=HTMLResponse)
+async def risultato(request: Request):
+    form = await request.form()
+    try:
+        # Solo cifre ASCII: isdigit() accetta anche "²" o "٣", che int() rifiuta
+        vector = _answers.validate_python(
+            {key: value for key, value in form.items() if key.isascii() and key.isdigit()}
+        )
+    except ValidationError as e:
+        page = render("errore", "Questionario incompleto", questions=", ".join(_invalid_questions(e)))
+        return HTMLResponse(page, status_code=400)
+
+    result = classify_submission(vector)
+    record_result(vector, result)
+    try:
+        await store_submission(vector, result)
+    except HTTPException as e:
+        page = render("occupato", "Servizio sovraccarico")
+        return HTMLResponse(page, status_code=e.status_code, headers=e.headers)
+    return HTMLResponse(_RESULT_PAGES[result.type].substitute(result.scores))
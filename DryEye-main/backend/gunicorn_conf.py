@@ -0,0 +1,98 @@
+"""
+Configurazione gunicorn per la modalità di produzione multi-worker.
+
+Gunicorn gestisce la porta condivisa, riavvia i worker terminati in modo
+anomalo e alla ricezione di SIGTERM smette di accettare connessioni e
+attende le richieste in corso fino a graceful_timeout.
+
+Variabili d'ambiente:
+- WEB_CONCURRENCY: numero di worker (predefinito: CPU disponibili al
+  container, vedi _cpu_count)
+- BACKEND_BIND: indirizzo di ascolto (predefinito 0.0.0.0:8001)
+- GRACEFUL_TIMEOUT: secondi concessi ai worker per terminare (predefinito 30)
+"""
+import itertools
+import math
+import multiprocessing
+import os
+from typing import Optional
+
+# File della quota CFS: cgroup v2 ("<quota> <periodo>" oppure "max <periodo>")
+# e cgroup v1 (quota e periodo separati, quota -1 = nessun limite)
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+CGROUP_V1_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU concesse dalla quota CFS del cgroup (es. 1.5); None se non limitata"""
+    cpu_max = _read(CGROUP_V2_CPU_MAX)
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+    else:
+        quota, period = _read(CGROUP_V1_QUOTA), _read(CGROUP_V1_PERIOD)
+    try:
+        quota, period = int(quota), int(period)
+    except (TypeError, ValueError):  # "max", file assenti o illeggibili
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
+
+
+def _cpu_count() -> int:
+    """
+    CPU utilizzabili: il cpuset del processo (sched_getaffinity), ridotto
+    alla quota CFS del cgroup se presente (docker --cpus, limiti Kubernetes),
+    che sched_getaffinity non vede: un container limitato a 1 CPU su un host
+    da 64 core avvia 1 worker, non 64.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = multiprocessing.cpu_count()
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        count = min(count, max(1, math.ceil(limit)))
+    return count
+
+
+bind = os.environ.get("BACKEND_BIND", "0.0.0.0:8001")
+workers = int(os.environ.get("WEB_CONCURRENCY", _cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+keepalive = int(os.environ.get("KEEPALIVE_TIMEOUT", "75"))
+# Riciclo periodico dei worker, sfalsato per non riavviarli tutti insieme
+max_requests = int(os.environ.get("MAX_REQUESTS", "100000"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+errorlog = "-"
+
+
+def pre_fork(server, worker):
+    # Slot stabile 0..workers-1: il worker che ne sostituisce uno terminato
+    # (crash o max_requests) riprende lo stesso slot e quindi i suoi file
+    # (statistiche aggregate, vedi backend/aggregates.py)
+    used = {getattr(w, "slot", None) for w in server.WORKERS.values()}
+    worker.slot = next(slot for slot in itertools.count() if slot not in used)
+
+
+def post_fork(server, worker):
+    os.environ["WORKER_SLOT"] = str(worker.slot)
+
+
+def child_exit(server, worker):
+    # Con PROMETHEUS_MULTIPROC_DIR rimuove le metriche live del worker terminato
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,189 @@
+"""
+Tabella precalcolata di tutti i risultati possibili del classificatore.
+
+Solo le domande 1-7 (scala 0-4) e 11, 14, 15, 16, 18, 19, 20 (sì/no)
+influiscono sul risultato: 5^7 × 2^7 = 10.000.000 combinazioni. Per ognuna
+la tabella contiene 4 byte: indice del risultato (RESULT_KEYS), punteggio
+evaporativo, punteggio acquoso e sintomi totali. La tabella viene costruita
+all'avvio con il motore vettoriale oppure caricata da file con mmap, così i
+worker che la condividono non ne duplicano la memoria. Con più worker la
+costruzione del file è serializzata da un lock (`<percorso>.lock`): il primo
+worker la scrive, gli altri attendono e la mappano.
+
+Costruzione del file:
+    python -m backend.lookup_table /percorso/tabella.bin
+"""
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+
+from backend.rules import CLASSIFICATION_RULES, SCALE_QUESTIONS, SCORE_WEIGHTS, referenced_questions
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DRYEYELT"
+ENTRY_SIZE = 4
+SCALE_VALUES = 5
+
+_SCALE, _YESNO = referenced_questions()
+ENTRY_COUNT = SCALE_VALUES ** len(_SCALE) * 2 ** len(_YESNO)
+
+
+def rules_fingerprint() -> bytes:
+    """Impronta delle regole: un file costruito con regole diverse non viene caricato"""
+    source = repr((list(SCALE_QUESTIONS), SCORE_WEIGHTS, CLASSIFICATION_RULES, _SCALE, _YESNO))
+    return hashlib.sha256(source.encode("utf-8")).digest()[:8]
+
+
+def build_table() -> bytes:
+    """Calcola tutte le combinazioni con il motore vettoriale (NumPy)"""
+    import numpy as np
+
+    from backend.vectorized import QUESTION_COUNT, score_matrix
+
+    yesno_count = 2 ** len(_YESNO)
+    scale_count = SCALE_VALUES ** len(_SCALE)
+    chunk = SCALE_VALUES ** 4            # combinazioni scala per blocco
+    table = np.empty((ENTRY_COUNT, ENTRY_SIZE), dtype=np.uint8)
+
+    yesno_index = np.arange(yesno_count)
+    for start in range(0, scale_count, chunk):
+        scale_index = np.arange(start, min(start + chunk, scale_count))
+        rows = len(scale_index) * yesno_count
+        matrix = np.zeros((rows, QUESTION_COUNT), dtype=np.int64)
+        # Indice = cifre scala in base 5, seguite dai bit sì/no (stesso ordine di lookup())
+        for i, q in enumerate(_SCALE):
+            digits = scale_index // SCALE_VALUES ** (len(_SCALE) - 1 - i) % SCALE_VALUES
+            matrix[:, q - 1] = np.repeat(digits, yesno_count)
+        for j, q in enumerate(_YESNO):
+            bits = (yesno_index >> (len(_YESNO) - 1 - j)) & 1
+            matrix[:, q - 1] = np.tile(bits, len(scale_index))
+
+        evaporative, aqueous, total, type_index = score_matrix(matrix)
+        offset = start * yesno_count
+        block = table[offset:offset + rows]
+        block[:, 0] = type_index
+        block[:, 1] = evaporative
+        block[:, 2] = aqueous
+        block[:, 3] = total
+
+    return table.tobytes()
+
+
+def write_table(path: str) -> None:
+    """Scrive la tabella su file (intestazione + dati) in modo atomico"""
+    data = build_table()
+    # File temporaneo univoco nella stessa cartella: due scritture concorrenti
+    # non si sovrascrivono e il rename resta atomico
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + rules_fingerprint())
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class LookupTable:
+    """Tabella dei risultati, in memoria o mappata da file"""
+
+    HEADER_SIZE = len(MAGIC) + 8
+
+    def __init__(self, data, offset: int, source: str, load_seconds: float):
+        self._data = data
+        self._offset = offset
+        self.source = source
+        self.load_seconds = load_seconds
+
+    @classmethod
+    def build(cls) -> "LookupTable":
+        started = time.perf_counter()
+        data = build_table()
+        return cls(data, 0, "built", time.perf_counter() - started)
+
+    @classmethod
+    def load(cls, path: str) -> "LookupTable":
+        """Mappa il file in memoria; solleva ValueError se non è valido per le regole correnti"""
+        started = time.perf_counter()
+        with open(path, "rb") as f:
+            # Intestazione e dimensione sono verificate prima di mappare il file
+            if f.read(cls.HEADER_SIZE) != MAGIC + rules_fingerprint():
+                raise ValueError(f"Tabella {path} non compatibile con le regole correnti")
+            if os.fstat(f.fileno()).st_size != cls.HEADER_SIZE + ENTRY_COUNT * ENTRY_SIZE:
+                raise ValueError(f"Tabella {path} di dimensione inattesa")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, cls.HEADER_SIZE, f"mmap:{path}", time.perf_counter() - started)
+
+    @classmethod
+    def from_config(cls, path: Optional[str]) -> "LookupTable":
+        """Carica il file se valido, altrimenti costruisce la tabella (e la salva se c'è un percorso)"""
+        if not path:
+            return cls.build()
+        try:
+            lock = open(f"{path}.lock", "a")
+        except OSError as e:
+            logger.warning("Impossibile creare il lock della tabella in %s (%s), uso la copia in memoria", path, e)
+            return cls.build()
+        with lock:
+            # Un solo processo alla volta verifica e (ri)costruisce il file
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.exists(path):
+                try:
+                    return cls.load(path)
+                except ValueError as e:
+                    logger.warning("%s, ricostruzione in corso", e)
+            started = time.perf_counter()
+            try:
+                write_table(path)
+            except OSError as e:
+                logger.warning("Impossibile salvare la tabella in %s (%s), uso la copia in memoria", path, e)
+                return cls.build()
+            table = cls.load(path)
+            table.source = f"built+mmap:{path}"
+            table.load_seconds = time.perf_counter() - started
+            return table
+
+    def lookup_vector(self, vector: Tuple[int, ...]) -> Tuple[int, Tuple[int, int, int]]:
+        """
+        (indice risultato, (evaporativo, acquoso, sintomi totali)) per il
+        vettore di risposte già validato (backend/answers.py)
+        """
+        index = 0
+        for q in _SCALE:
+            index = index * SCALE_VALUES + vector[q - 1]
+        for q in _YESNO:
+            index = (index << 1) | vector[q - 1]
+        return self._entry(index)
+
+    def _entry(self, index: int) -> Tuple[int, Tuple[int, int, int]]:
+        offset = self._offset + index * ENTRY_SIZE
+        result_index, evaporative, aqueous, total = self._data[offset:offset + ENTRY_SIZE]
+        return result_index, (evaporative, aqueous, total)
+
+    def report(self) -> Dict[str, object]:
+        """Tempo di avvio e memoria occupata dalla tabella"""
+        return {
+            "source": self.source,
+            "entries": ENTRY_COUNT,
+            "bytes": ENTRY_COUNT * ENTRY_SIZE,
+            "load_seconds": round(self.load_seconds, 4),
+            "memory_mapped": isinstance(self._data, mmap.mmap),
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Uso: python -m backend.lookup_table <percorso>")
+    table = LookupTable.from_config(sys.argv[1])
+    print(table.report())
@@ -0,0 +1,156 @@
+"""
+Metriche Prometheus del backend.
+
+- dry_eye_http_request_duration_seconds: latenza per metodo e route (template
+  del percorso, non il percorso effettivo, per limitare la cardinalità)
+- dry_eye_http_requests_total: richieste per metodo, route e status
+- dry_eye_submit_stage_seconds: tempi di submit_questionnaire per fase
+  (validation, classification, serialization)
+- dry_eye_results_total: risultati per tipo
+- dry_eye_startup_seconds: tempo di avvio del processo (dall'import del
+  backend alla readiness), uno per worker attivo
+
+Il middleware è ASGI puro (nessun BaseHTTPMiddleware) e i figli delle metriche
+con etichette fisse sono risolti una volta sola, così il costo sul percorso di
+submit resta di pochi microsecondi. Con gunicorn multi-worker impostare
+PROMETHEUS_MULTIPROC_DIR per aggregare le metriche di tutti i processi.
+
+prometheus-client è opzionale: se non è installato le metriche sono disattivate.
+"""
+import os
+from time import perf_counter
+
+Histogram = None
+# Con METRICS_ENABLED=0 prometheus-client non viene nemmeno importato
+if os.environ.get("METRICS_ENABLED", "1") == "1":
+    try:
+        from prometheus_client import (
+            CONTENT_TYPE_LATEST,
+            REGISTRY,
+            CollectorRegistry,
+            Counter,
+            Gauge,
+            Histogram,
+            generate_latest,
+            multiprocess,
+        )
+    except ImportError:  # prometheus-client è opzionale
+        pass
+
+ENABLED = Histogram is not None
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+SUBMIT_STAGES = ("validation", "classification", "serialization")
+
+
+class _NoopMetric:
+    """Sostituto delle metriche quando sono disattivate"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+
+if ENABLED:
+    REQUEST_LATENCY = Histogram(
+        "dry_eye_http_request_duration_seconds",
+        "Latenza delle richieste HTTP per route",
+        ["method", "route"],
+        buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS = Counter(
+        "dry_eye_http_requests",
+        "Richieste HTTP per route e status",
+        ["method", "route", "status"],
+    )
+    SUBMIT_STAGE = Histogram(
+        "dry_eye_submit_stage_seconds",
+        "Tempi delle fasi di submit_questionnaire",
+        ["stage"],
+        buckets=STAGE_BUCKETS,
+    )
+    RESULTS = Counter(
+        "dry_eye_results",
+        "Risultati della classificazione per tipo",
+        ["type"],
+    )
+    STARTUP_SECONDS = Gauge(
+        "dry_eye_startup_seconds",
+        "Tempo di avvio del processo fino alla readiness",
+        multiprocess_mode="liveall",
+    )
+else:
+    REQUEST_LATENCY = REQUESTS = SUBMIT_STAGE = RESULTS = STARTUP_SECONDS = _NoopMetric()
+
+# Figli precalcolati per il percorso di submit
+STAGE_TIMERS = {stage: SUBMIT_STAGE.labels(stage) for stage in SUBMIT_STAGES}
+_result_counters = {}
+
+
+def count_result(result_type: str) -> None:
+    counter = _result_counters.get(result_type)
+    if counter is None:
+        counter = _result_counters[result_type] = RESULTS.labels(result_type)
+    counter.inc()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI che misura latenza e status per route"""
+
+    def __init__(self, app):
+        self.app = app
+        self._children = {}
+
+    def _metrics_for(self, method: str, route: str, status: int):
+        key = (method, route, status)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                REQUEST_LATENCY.labels(method, route),
+                REQUESTS.labels(method, route, str(status)),
+            )
+        return children
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            latency, requests = self._metrics_for(
+                scope["method"], getattr(route, "path", "unmatched"), status
+            )
+            latency.observe(perf_counter() - started)
+            requests.inc()
+
+
+def render_latest():
+    """(corpo, content type) per l'endpoint /metrics"""
+    if not ENABLED:
+        return b"", "text/plain; charset=utf-8"
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,110 @@
+"""
+Risposte statiche (JSON o pagine HTML pre-renderizzate) serializzate una sola
+volta all'avvio.
+
+Il corpo viene codificato in bytes (backend/fast_json.py) con le varianti
+gzip (e brotli, se il pacchetto `brotli` è installato) e servito con ETag
+forte e Cache-Control. Ogni codifica è una rappresentazione distinta e ha
+un proprio ETag forte (hash del corpo, con suffisso "-gzip" o "-br" per le
+varianti compresse); le richieste con If-None-Match corrispondente alla
+rappresentazione scelta ricevono 304 senza corpo.
+"""
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from backend.fast_json import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli è opzionale
+    brotli = None
+
+ENCODINGS = ("gzip", "br") if brotli is not None else ("gzip",)
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Interpreta Accept-Encoding in un dizionario codifica -> qualità"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+class PrecompressedPayload:
+    """Payload immutabile con varianti compresse ed ETag precalcolati"""
+
+    def __init__(self, payload: object, max_age: int = 3600, media_type: str = "application/json",
+                 cache=None):
+        """`cache`: SharedCache opzionale da cui leggere (e in cui salvare) le varianti compresse"""
+        self.payload = payload
+        self.media_type = media_type
+        if isinstance(payload, bytes):
+            self.body = payload
+        else:
+            self.body = dumps(payload)
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.variants: Dict[str, bytes] = cache.load_variants(self.etag, ENCODINGS) if cache is not None else None
+        if not self.variants:
+            self.variants = {"gzip": gzip.compress(self.body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(self.body, quality=11)
+            if cache is not None:
+                cache.store_variants(self.etag, self.variants)
+        # ETag per rappresentazione: None è il corpo non compresso
+        self.etags: Dict[Optional[str], str] = {None: self.etag}
+        for encoding in self.variants:
+            self.etags[encoding] = f'{self.etag[:-1]}-{encoding}"'
+        self.headers: Dict[Optional[str], Dict[str, str]] = {
+            encoding: {
+                "ETag": etag,
+                "Cache-Control": f"public, max-age={max_age}",
+                "Vary": "Accept-Encoding",
+            }
+            for encoding, etag in self.etags.items()
+        }
+
+    def not_modified(self, if_none_match: Optional[str], encoding: Optional[str] = None) -> bool:
+        """Vero se If-None-Match contiene l'ETag della rappresentazione `encoding` (o '*')"""
+        if not if_none_match:
+            return False
+        etag = self.etags[encoding]
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    def select(self, accept_encoding: str) -> Optional[str]:
+        """Sceglie la variante compressa migliore accettata dal client (br, poi gzip)"""
+        if not accept_encoding:
+            return None
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+        return None
+
+    def response(self, request: Request) -> Response:
+        """Costruisce la risposta per la richiesta, senza passare dal JSON encoder"""
+        encoding = self.select(request.headers.get("accept-encoding", ""))
+        headers = self.headers[encoding]
+        if self.not_modified(request.headers.get("if-none-match"), encoding):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            return Response(content=self.body, media_type=self.media_type, headers=headers)
+        return Response(
+            content=self.variants[encoding],
+            media_type=self.media_type,
+            headers={**headers, "Content-Encoding": encoding},
+        )
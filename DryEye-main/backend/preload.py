@@ -0,0 +1,66 @@
+"""
+Incorpora in index.html le domande del questionario.
+
+Il payload di /api/questionnaire/questions viene inserito come JSON in un
+<script type="application/json"> prima di </head>: il frontend disegna il
+questionario senza alcuna chiamata API. Solo i dati letti da App.js vengono
+incorporati.
+
+Eseguito nel Dockerfile sul build del frontend, con il backend della stessa
+immagine, quindi le domande incorporate coincidono con quelle dell'API;
+rieseguirlo sostituisce il blocco già presente.
+
+Esempio (dalla cartella che contiene `backend`):
+    python -m backend.preload /usr/share/nginx/html/index.html
+"""
+import json
+import re
+import sys
+from typing import Dict, List, Optional
+
+PRELOAD_ID = "questionnaire-preload"
+
+_PRELOAD_BLOCK = re.compile(
+    r'<script id="' + PRELOAD_ID + r'" type="application/json">.*?</script>\n?', re.DOTALL
+)
+
+
+def preload_data(questions: Dict) -> Dict:
+    """Dati letti da App.js (readPreloaded)"""
+    return {"questions": questions}
+
+
+def preload_script(data: Dict) -> str:
+    """Blocco <script> con i dati; "</" è escapato per non chiudere lo script"""
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    return f'<script id="{PRELOAD_ID}" type="application/json">{body}</script>\n'
+
+
+def embed(html: str, script: str) -> str:
+    """index.html con il blocco aggiornato (sostituito se già presente)"""
+    html = _PRELOAD_BLOCK.sub("", html)
+    if "</head>" not in html:
+        raise ValueError("index.html senza </head>")
+    return html.replace("</head>", script + "</head>", 1)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from backend.server import QUESTIONS_PAYLOAD
+
+    paths = argv if argv is not None else sys.argv[1:]
+    if not paths:
+        print("uso: python -m backend.preload INDEX_HTML...", file=sys.stderr)
+        return 2
+
+    script = preload_script(preload_data(QUESTIONS_PAYLOAD))
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(embed(html, script))
+        print(f"{path}: domande incorporate ({len(script)} byte)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Cache LRU dei risultati di classificazione.
+
+La chiave è un intero che impacchetta le sole risposte che influiscono sul
+risultato (domande scala 3 bit ciascuna, domande sì/no 1 bit), quindi due
+questionari con la stessa chiave hanno sempre lo stesso risultato. Le
+risposte sono già validate (backend/answers.py), quindi ogni vettore ha una
+chiave.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Tuple, TypeVar
+
+from backend.rules import referenced_questions
+
+T = TypeVar("T")
+
+_SCALE, _YESNO = referenced_questions()
+
+
+def pack_vector(vector: Tuple[int, ...]) -> int:
+    """Codifica canonica delle risposte rilevanti del vettore già validato (backend/answers.py)"""
+    key = 0
+    for q in _SCALE:
+        key = (key << 3) | vector[q - 1]
+    for q in _YESNO:
+        key = (key << 1) | vector[q - 1]
+    return key
+
+
+class ResultCache(Generic[T]):
+    """Cache LRU limitata con contatori di hit, miss ed eviction"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, T]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute_key(self, key: int, compute: Callable[..., T], *args) -> T:
+        """Risultato in cache per `key`; in caso di miss lo calcola con `compute(*args)` e lo memorizza"""
+        if self.maxsize <= 0:
+            return compute(*args)
+
+        entries = self._entries
+        value = entries.get(key)
+        if value is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute(*args)
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def put(self, key: int, value: T) -> None:
+        """Inserisce un risultato già calcolato (riempimento dalla cache condivisa)"""
+        if self.maxsize <= 0:
+            return
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
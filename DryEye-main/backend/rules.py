@@ -0,0 +1,228 @@
+"""
+Regole di classificazione dell'occhio secco, espresse come dati.
+
+- SCORE_WEIGHTS: tabella pesi per ciascun punteggio. Le domande scala
+  (SCALE_QUESTIONS) contribuiscono peso × valore 0-4, le domande sì/no
+  contribuiscono il peso solo se la risposta è 'si'.
+- CLASSIFICATION_RULES: soglie valutate in ordine; vince la prima regola
+  con tutte le condizioni soddisfatte.
+- RESULT_DEFINITIONS: testi del risultato per ciascuna regola.
+
+Le tabelle sono immutabili (tuple e MappingProxyType) e vengono verificate
+una sola volta all'import da validate_rules. `compile_scorer` trasforma queste tabelle, una sola volta all'avvio, in una
+funzione che calcola punteggi e indice del risultato per un questionario.
+"""
+import operator
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Tuple
+
+SCALE_QUESTIONS = range(1, 8)
+
+
+def _frozen(table: Dict[str, Dict]) -> Mapping[str, Mapping]:
+    """Tabella a due livelli in sola lettura"""
+    return MappingProxyType({key: MappingProxyType(value) for key, value in table.items()})
+
+
+# Punteggi restituiti nel campo `scores` del risultato
+PUBLIC_SCORES = ("evaporativeScore", "aqueousScore", "totalSymptoms")
+
+# I punteggi pubblici devono essere i primi della tabella, nello stesso ordine
+SCORE_WEIGHTS: Mapping[str, Mapping[int, int]] = _frozen({
+    # Evaporativo: domande 2, 3, 5, 7, 14, 19
+    "evaporativeScore": {2: 1, 3: 1, 5: 1, 7: 1, 14: 2, 19: 2},
+    # Deficit acquoso: domande 1, 6, 15, 16, 11, 18
+    "aqueousScore": {1: 1, 6: 1, 15: 2, 16: 2, 11: 2, 18: 2},
+    # Sintomi totali: domande 1-7
+    "totalSymptoms": {q: 1 for q in SCALE_QUESTIONS},
+    # Indicatore neuropatico: risposta positiva alla 20
+    "neuropathicIndicator": {20: 1},
+})
+
+OPERATORS: Mapping[str, Callable] = MappingProxyType({
+    ">=": operator.ge,
+    ">": operator.gt,
+})
+
+# (chiave risultato, condizioni); il lato destro è una soglia o un altro punteggio
+CLASSIFICATION_RULES: Tuple[Tuple[str, Tuple[Tuple[str, str, object], ...]], ...] = (
+    ("neuropathic", (("neuropathicIndicator", ">=", 1), ("totalSymptoms", ">=", 15))),
+    ("mixed", (("evaporativeScore", ">=", 12), ("aqueousScore", ">=", 10))),
+    ("evaporative", (("evaporativeScore", ">", "aqueousScore"), ("evaporativeScore", ">=", 8))),
+    ("aqueous", (("aqueousScore", ">=", 8),)),
+    ("mild", ()),
+)
+
+# Le raccomandazioni sono tuple: i testi sono condivisi da tutti i risultati
+RESULT_DEFINITIONS: Mapping[str, Mapping[str, object]] = _frozen({
+    "neuropathic": {
+        "type": "Occhio Secco Neuropatico",
+        "description": "Il tuo profilo è compatibile con un occhio secco di tipo neuropatico. I sintomi sono intensi ma spesso l'esame oculistico può risultare normale o con pochi segni clinici visibili.",
+        "recommendations": (
+            "Considera una valutazione neurologica specializzata",
+            "Potrebbero essere utili terapie specifiche per il dolore neuropatico",
+            "Mantieni un diario dei sintomi per identificare i trigger",
+        ),
+    },
+    "mixed": {
+        "type": "Occhio Secco Misto",
+        "description": "Il tuo profilo presenta caratteristiche sia dell'occhio secco evaporativo che del deficit acquoso. Questa forma combinata richiede un approccio terapeutico multiplo.",
+        "recommendations": (
+            "Combina impacchi caldi e lacrime artificiali",
+            "Valuta igiene palpebrale quotidiana",
+            "Potrebbero essere necessari diversi tipi di lacrime artificiali",
+        ),
+    },
+    "evaporative": {
+        "type": "Occhio Secco Evaporativo",
+        "description": "Il tuo profilo è compatibile con un occhio secco di tipo evaporativo, spesso legato alla disfunzione delle ghiandole di Meibomio che producono la componente oleosa delle lacrime.",
+        "recommendations": (
+            "Impacchi caldi sulle palpebre 2 volte al giorno",
+            "Massaggio delicato delle palpebre",
+            "Igiene palpebrale con prodotti specifici",
+            "Riduci l'uso prolungato di schermi digitali",
+        ),
+    },
+    "aqueous": {
+        "type": "Occhio Secco da Deficit Acquoso",
+        "description": "Il tuo profile è compatibile con un occhio secco da deficit acquoso, caratterizzato da una ridotta produzione della componente acquosa delle lacrime.",
+        "recommendations": (
+            "Lacrime artificiali frequenti (senza conservanti se usate spesso)",
+            "Considera lacrime più viscose per la notte",
+            "Evita ambienti secchi o ventosi",
+            "Valuta possibili farmaci che potrebbero influire sulla produzione lacrimale",
+        ),
+    },
+    "mild": {
+        "type": "Occhio Secco Lieve",
+        "description": "I tuoi sintomi suggeriscono una forma lieve di occhio secco. Potrebbero essere sufficienti misure preventive e trattamenti semplici.",
+        "recommendations": (
+            "Lacrime artificiali al bisogno",
+            "Pause frequenti durante l'uso di schermi",
+            "Mantieni una buona idratazione",
+            "Controlla l'umidità degli ambienti dove passi più tempo",
+        ),
+    },
+})
+
+
+
+def validate_rules(weights: Mapping[str, Mapping[int, int]], rules: Tuple,
+                   definitions: Mapping[str, Mapping]) -> None:
+    """Verifica la coerenza delle tabelle; solleva ValueError. Chiamata una volta all'import"""
+    if tuple(weights)[:len(PUBLIC_SCORES)] != PUBLIC_SCORES:
+        raise ValueError(f"SCORE_WEIGHTS deve iniziare con i punteggi pubblici {PUBLIC_SCORES}")
+    for name, table in weights.items():
+        for q, weight in table.items():
+            if not isinstance(q, int) or q < 1 or not isinstance(weight, int):
+                raise ValueError(f"Peso non valido in {name}: {q}={weight!r}")
+    for key, conditions in rules:
+        for left, op, right in conditions:
+            if left not in weights or op not in OPERATORS:
+                raise ValueError(f"Condizione non valida nella regola {key}: {left} {op} {right}")
+            if isinstance(right, str) and right not in weights:
+                raise ValueError(f"Punteggio sconosciuto nella regola {key}: {right}")
+        definition = definitions.get(key)
+        if definition is None or set(definition) != {"type", "description", "recommendations"}:
+            raise ValueError(f"Definizione del risultato mancante o incompleta per la regola {key}")
+    if not rules or rules[-1][1]:
+        raise ValueError("CLASSIFICATION_RULES deve terminare con una regola senza condizioni")
+
+
+validate_rules(SCORE_WEIGHTS, CLASSIFICATION_RULES, RESULT_DEFINITIONS)
+
+RESULT_KEYS = tuple(key for key, _ in CLASSIFICATION_RULES)
+RESULT_TYPES = tuple(RESULT_DEFINITIONS[key]["type"] for key in RESULT_KEYS)
+
+
+def referenced_questions() -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Domande scala e sì/no usate dalla tabella pesi, nell'ordine di prima comparsa.
+    Tutte le domande scala sono incluse perché concorrono ai sintomi totali.
+    """
+    scale: List[int] = []
+    yesno: List[int] = []
+    for weights in SCORE_WEIGHTS.values():
+        for q in weights:
+            target = scale if q in SCALE_QUESTIONS else yesno
+            if q not in target:
+                target.append(q)
+    return tuple(scale), tuple(yesno)
+
+
+def compile_conditions(score_names: Tuple[str, ...]) -> List[Tuple[Tuple[int, Callable, object, bool], ...]]:
+    """
+    Traduce CLASSIFICATION_RULES in tuple (indice punteggio, operatore,
+    soglia o indice punteggio, lato destro è un punteggio).
+    """
+    slot = {name: i for i, name in enumerate(score_names)}
+    compiled = []
+    for _, conditions in CLASSIFICATION_RULES:
+        compiled.append(tuple(
+            (slot[left], OPERATORS[op], slot[right] if isinstance(right, str) else right, isinstance(right, str))
+            for left, op, right in conditions
+        ))
+    return compiled
+
+
+def compile_scorer() -> Callable[[Dict[str, str]], Tuple[int, Tuple[int, ...]]]:
+    """
+    Compila le tabelle in una funzione `score(answers) -> (indice risultato, punteggi)`.
+    I punteggi seguono l'ordine di SCORE_WEIGHTS; l'indice risultato segue RESULT_KEYS.
+
+    Il sorgente della funzione è generato dalle tabelle ed eseguito una volta
+    sola, così ogni chiamata esegue solo espressioni lineari senza cicli.
+    """
+    return _compile(
+        "answers",
+        ["    get = answers.get"],
+        lambda q: f"int(get('{q}', '0'))",
+        lambda q: f"1 if get('{q}') == 'si' else 0",
+    )
+
+
+def compile_vector_scorer() -> Callable[[Tuple[int, ...]], Tuple[int, Tuple[int, ...]]]:
+    """
+    Come compile_scorer, ma per il vettore di 20 interi già validato
+    (scala 0-4, sì = 1, no = 0; vedi backend/answers.py).
+    """
+    return _compile("vector", [], lambda q: f"vector[{q - 1}]", lambda q: f"vector[{q - 1}]")
+
+
+def _compile(argument: str, prologue: List[str], read_scale: Callable[[int], str],
+             read_yesno: Callable[[int], str]) -> Callable:
+    scale, yesno = referenced_questions()
+    lines = [f"def score({argument}):", *prologue]
+    for q in scale:
+        lines.append(f"    q{q} = {read_scale(q)}")
+    for q in yesno:
+        lines.append(f"    q{q} = {read_yesno(q)}")
+    for i, weights in enumerate(SCORE_WEIGHTS.values()):
+        terms = " + ".join(f"q{q}" if w == 1 else f"{w} * q{q}" for q, w in weights.items())
+        lines.append(f"    s{i} = {terms or '0'}")
+    scores = "(" + ", ".join(f"s{i}" for i in range(len(SCORE_WEIGHTS))) + ",)"
+
+    for index, conditions in enumerate(compile_conditions(tuple(SCORE_WEIGHTS))):
+        test = " and ".join(
+            f"s{left} {_symbol(op)} {f's{right}' if right_is_score else repr(right)}"
+            for left, op, right, right_is_score in conditions
+        )
+        if test:
+            lines.append(f"    if {test}:")
+            lines.append(f"        return {index}, {scores}")
+        else:
+            # validate_rules garantisce che l'ultima regola non abbia condizioni
+            lines.append(f"    return {index}, {scores}")
+            break
+
+    namespace: Dict[str, object] = {}
+    exec(compile("\n".join(lines), "<dry-eye-rules>", "exec"), namespace)
+    return namespace["score"]
+
+
+def _symbol(op: Callable) -> str:
+    """Simbolo Python corrispondente a un operatore di OPERATORS"""
+    for symbol, candidate in OPERATORS.items():
+        if candidate is op:
+            return symbol
+    raise ValueError(f"Operatore non supportato: {op}")
@@ -1,20 +1,46 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
 import os
+import logging
+import time
 from datetime import datetime
+from time import perf_counter
 
-app = FastAPI(title="Dry Eye Questionnaire API", version="1.0.0")
-
-# CORS middleware configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+from backend.admission import AdmissionController, admission_from_env
+from backend.aggregates import AggregateStats, SnapshotTask, snapshot_task_from_env
+from backend.answers import AnswerVector, vector_to_answers
+from backend.binary_codec import (
+    ANSWERS_MEDIA_TYPE,
+    RECORD_SIZE,
+    RESULT_MEDIA_TYPE,
+    decode_answers,
+    encode_error,
+    encode_result,
+    is_binary_request,
+    wants_binary_response,
 )
+from backend.fast_json import FastJSONResponse
+from backend.lookup_table import LookupTable
+from backend.metrics import STAGE_TIMERS, STARTUP_SECONDS, count_result, render_latest
+from backend.precompressed import PrecompressedPayload
+from backend.result_cache import ResultCache, pack_vector
+from backend.rules import PUBLIC_SCORES, RESULT_DEFINITIONS, RESULT_KEYS, compile_scorer, compile_vector_scorer
+from backend.shared_cache import SharedCache, shared_cache_from_env
+from backend.storage import StorageBusyError, SubmissionWriter, make_record, writer_from_env
+
+logger = logging.getLogger(__name__)
+
+# Tempo di avvio: dall'import del modulo al termine degli eventi di startup
+_startup_began = time.monotonic()
+startup_seconds: Optional[float] = None
+
+# Endpoint JSON dell'API; l'applicazione è costruita da backend/app.py
+router = APIRouter()
 
 # Pydantic models for request/response
 class QuestionnaireAnswer(BaseModel):
@@ -25,237 +51,569 @@ class QuestionnaireSubmission(BaseModel):
     answers: Dict[str, str]
     timestamp: Optional[datetime] = None
 
+class TypedQuestionnaireSubmission(BaseModel):
+    # Risposte validate e convertite nel vettore di 20 interi (backend/answers.py)
+    answers: AnswerVector
+    timestamp: Optional[datetime] = None
+
 class QuestionnaireResult(BaseModel):
+    # Immutabile: i modelli precostruiti e i risultati in cache sono condivisi tra le richieste
+    model_config = ConfigDict(frozen=True)
+
     type: str
     description: str
-    recommendations: List[str]
+    recommendations: Tuple[str, ...]
     scores: Dict[str, int]
 
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[QuestionnaireResult] = None
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
 # Classification algorithm
+# Le regole sono compilate una sola volta all'avvio; i cinque risultati sono
+# modelli precostruiti (validati qui, una volta) condivisi tra le richieste.
+_score_answers = compile_scorer()
+_score_vector = compile_vector_scorer()
+_RESULT_TEMPLATES = tuple(
+    QuestionnaireResult(**RESULT_DEFINITIONS[key], scores={}) for key in RESULT_KEYS
+)
+
 def classify_dry_eye(answers: Dict[str, str]) -> QuestionnaireResult:
     """
     Classifica il tipo di occhio secco basato sulle risposte del questionario
     
-    Logica di classificazione:
+    Logica di classificazione (vedi backend/rules.py):
     - Evaporativo: punteggi alti alle domande 2, 3, 5, 7, 14, 19
     - Deficit acquoso: domande 1, 6, 15, 16, 11, 18
     - Neuropatico: risposta positiva alla 20 con sintomi elevati
     - Misto: se entrambe le categorie precedenti hanno punteggi elevati
     """
-    
-    evaporative_questions = [2, 3, 5, 7, 14, 19]
-    aqueous_deficit_questions = [1, 6, 15, 16, 11, 18]
-    neuropathic_indicator = answers.get('20') == 'si'
-    
-    evaporative_score = 0
-    aqueous_score = 0
-    total_symptoms = 0
-
-    # Calcola punteggio evaporativo
-    for q in evaporative_questions:
-        answer = answers.get(str(q), '0')
-        if q <= 7:
-            # Domande scala 0-4
-            evaporative_score += int(answer)
-        else:
-            # Domande sì/no (sì = 2 punti, no = 0)
-            evaporative_score += 2 if answer == 'si' else 0
-
-    # Calcola punteggio deficit acquoso
-    for q in aqueous_deficit_questions:
-        answer = answers.get(str(q), '0')
-        if q <= 7:
-            # Domande scala 0-4
-            aqueous_score += int(answer)
-        else:
-            # Domande sì/no (sì = 2 punti, no = 0)
-            aqueous_score += 2 if answer == 'si' else 0
-
-    # Calcola sintomi totali (domande 1-7)
-    for i in range(1, 8):
-        total_symptoms += int(answers.get(str(i), '0'))
-
-    # Logica di classificazione
-    if neuropathic_indicator and total_symptoms >= 15:
-        return QuestionnaireResult(
-            type="Occhio Secco Neuropatico",
-            description="Il tuo profilo è compatibile con un occhio secco di tipo neuropatico. I sintomi sono intensi ma spesso l'esame oculistico può risultare normale o con pochi segni clinici visibili.",
-            recommendations=[
-                "Considera una valutazione neurologica specializzata",
-                "Potrebbero essere utili terapie specifiche per il dolore neuropatico",
-                "Mantieni un diario dei sintomi per identificare i trigger"
-            ],
-            scores={
-                "evaporativeScore": evaporative_score,
-                "aqueousScore": aqueous_score,
-                "totalSymptoms": total_symptoms
-            }
-        )
-    elif evaporative_score >= 12 and aqueous_score >= 10:
-        return QuestionnaireResult(
-            type="Occhio Secco Misto",
-            description="Il tuo profilo presenta caratteristiche sia dell'occhio secco evaporativo che del deficit acquoso. Questa forma combinata richiede un approccio terapeutico multiplo.",
-            recommendations=[
-                "Combina impacchi caldi e lacrime artificiali",
-                "Valuta igiene palpebrale quotidiana",
-                "Potrebbero essere necessari diversi tipi di lacrime artificiali"
-            ],
-            scores={
-                "evaporativeScore": evaporative_score,
-                "aqueousScore": aqueous_score,
-                "totalSymptoms": total_symptoms
-            }
-        )
-    elif evaporative_score > aqueous_score and evaporative_score >= 8:
-        return QuestionnaireResult(
-            type="Occhio Secco Evaporativo",
-            description="Il tuo profilo è compatibile con un occhio secco di tipo evaporativo, spesso legato alla disfunzione delle ghiandole di Meibomio che producono la componente oleosa delle lacrime.",
-            recommendations=[
-                "Impacchi caldi sulle palpebre 2 volte al giorno",
-                "Massaggio delicato delle palpebre",
-                "Igiene palpebrale con prodotti specifici",
-                "Riduci l'uso prolungato di schermi digitali"
-            ],
-            scores={
-                "evaporativeScore": evaporative_score,
-                "aqueousScore": aqueous_score,
-                "totalSymptoms": total_symptoms
-            }
-        )
-    elif aqueous_score >= 8:
-        return QuestionnaireResult(
-            type="Occhio Secco da Deficit Acquoso",
-            description="Il tuo profile è compatibile con un occhio secco da deficit acquoso, caratterizzato da una ridotta produzione della componente acquosa delle lacrime.",
-            recommendations=[
-                "Lacrime artificiali frequenti (senza conservanti se usate spesso)",
-                "Considera lacrime più viscose per la notte",
-                "Evita ambienti secchi o ventosi",
-                "Valuta possibili farmaci che potrebbero influire sulla produzione lacrimale"
-            ],
-            scores={
-                "evaporativeScore": evaporative_score,
-                "aqueousScore": aqueous_score,
-                "totalSymptoms": total_symptoms
-            }
-        )
-    else:
-        return QuestionnaireResult(
-            type="Occhio Secco Lieve",
-            description="I tuoi sintomi suggeriscono una forma lieve di occhio secco. Potrebbero essere sufficienti misure preventive e trattamenti semplici.",
-            recommendations=[
-                "Lacrime artificiali al bisogno",
-                "Pause frequenti durante l'uso di schermi",
-                "Mantieni una buona idratazione",
-                "Controlla l'umidità degli ambienti dove passi più tempo"
-            ],
-            scores={
-                "evaporativeScore": evaporative_score,
-                "aqueousScore": aqueous_score,
-                "totalSymptoms": total_symptoms
-            }
+    index, scores = _score_answers(answers)
+    return _build_result(index, scores)
+
+def classify_vector(vector: Tuple[int, ...]) -> QuestionnaireResult:
+    """classify_dry_eye per il vettore di risposte già validato (TypedQuestionnaireSubmission)"""
+    return _build_result(*_score_vector(vector))
+
+def _build_result(index: int, scores) -> QuestionnaireResult:
+    """Risultato dal modello precostruito `index` con i punteggi pubblici"""
+    # Copia superficiale senza nuova validazione: testi e raccomandazioni sono
+    # gli oggetti immutabili del modello precostruito
+    return _RESULT_TEMPLATES[index].model_copy(update={"scores": dict(zip(PUBLIC_SCORES, scores))})
+
+# Cache LRU dei risultati, chiave = risposte rilevanti impacchettate in un intero.
+# RESULT_CACHE_SIZE=0 la disabilita. I risultati in cache sono condivisi tra le richieste.
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "4096"))
+result_cache = ResultCache(RESULT_CACHE_SIZE)
+
+# Cache condivisa tra i worker (Redis) dietro la cache LRU, opzionale: REDIS_URL
+# (vedi backend/shared_cache.py). I risultati vi sono scritti a lotti in background.
+shared_cache: Optional[SharedCache] = shared_cache_from_env()
+
+def _classify_and_share(key: int, vector: Tuple[int, ...]) -> QuestionnaireResult:
+    result = classify_vector(vector)
+    shared_cache.put_result(key, encode_result(result))
+    return result
+
+# Tabella precalcolata di tutti i risultati (opzionale): LOOKUP_TABLE_ENABLED=1,
+# con LOOKUP_TABLE_PATH la tabella viene salvata/caricata da file via mmap
+lookup_table: Optional[LookupTable] = None
+if os.environ.get("LOOKUP_TABLE_ENABLED", "0") == "1":
+    lookup_table = LookupTable.from_config(os.environ.get("LOOKUP_TABLE_PATH"))
+    logger.info("Tabella dei risultati pronta: %s", lookup_table.report())
+
+def classify_submission(vector: Tuple[int, ...]) -> QuestionnaireResult:
+    """Percorso degli endpoint: tabella precalcolata se attiva, altrimenti cache LRU"""
+    if lookup_table is not None:
+        return _build_result(*lookup_table.lookup_vector(vector))
+    key = pack_vector(vector)
+    if shared_cache is not None:
+        return result_cache.get_or_compute_key(key, _classify_and_share, key, vector)
+    return result_cache.get_or_compute_key(key, classify_vector, vector)
+
+# Rate limiting e limite di concorrenza (vedi backend/admission.py), applicati
+# dal middleware installato in backend/app.py
+admission_controller: Optional[AdmissionController] = admission_from_env()
+
+# Archiviazione asincrona a lotti delle sottomissioni (vedi backend/storage.py)
+submission_writer: Optional[SubmissionWriter] = None
+
+@router.on_event("startup")
+async def start_submission_writer():
+    global submission_writer
+    submission_writer = writer_from_env()
+    if submission_writer is not None:
+        await submission_writer.start()
+
+@router.on_event("shutdown")
+async def stop_submission_writer():
+    if submission_writer is not None:
+        await submission_writer.stop()
+
+@router.on_event("startup")
+async def start_shared_cache():
+    # Riempie la cache locale con i risultati già calcolati dagli altri worker
+    if shared_cache is None:
+        return
+    for key, value in await asyncio.to_thread(shared_cache.load_results, RESULT_CACHE_SIZE):
+        result_cache.put(key, _build_result(value[0], value[1:]))
+    await shared_cache.start()
+
+@router.on_event("shutdown")
+async def stop_shared_cache():
+    if shared_cache is not None:
+        await shared_cache.stop()
+
+# Statistiche aggregate per le dashboard (vedi backend/aggregates.py)
+aggregate_stats = AggregateStats()
+aggregate_snapshots: Optional[SnapshotTask] = None
+
+@router.on_event("startup")
+async def start_aggregate_snapshots():
+    global aggregate_snapshots
+    aggregate_snapshots = snapshot_task_from_env(aggregate_stats)
+    if aggregate_snapshots is not None:
+        await aggregate_snapshots.start()
+
+@router.on_event("shutdown")
+async def stop_aggregate_snapshots():
+    if aggregate_snapshots is not None:
+        await aggregate_snapshots.stop()
+
+def record_result(vector: Tuple[int, ...], result: QuestionnaireResult) -> None:
+    """Aggiorna metriche e statistiche aggregate per un questionario classificato"""
+    count_result(result.type)
+    aggregate_stats.record(vector, result.type, result.scores)
+
+@router.on_event("startup")
+async def mark_ready():
+    # Registrato per ultimo: /api/ready risponde solo a inizializzazione completata
+    global startup_seconds
+    startup_seconds = time.monotonic() - _startup_began
+    STARTUP_SECONDS.set(startup_seconds)
+    logger.info("Backend pronto in %.3fs", startup_seconds)
+
+async def store_submission(vector: Tuple[int, ...], result: QuestionnaireResult,
+                           timestamp: Optional[datetime] = None) -> None:
+    """Accoda la sottomissione per l'archiviazione; 503 se la coda è piena"""
+    if submission_writer is None:
+        return
+    try:
+        await submission_writer.enqueue(make_record(vector_to_answers(vector), result, timestamp))
+    except StorageBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Servizio temporaneamente sovraccarico, riprova tra poco.",
+            headers={"Retry-After": "1"}
         )
 
 # API Endpoints
-@app.get("/api/health")
+@router.get("/api/health")
 async def health_check():
     """Endpoint per verificare lo stato dell'API"""
-    return {"status": "healthy", "message": "Dry Eye Questionnaire API is running"}
+    return FastJSONResponse({"status": "healthy", "message": "Dry Eye Questionnaire API is running"})
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Metriche in formato Prometheus"""
+    content, media_type = render_latest()
+    return Response(content=content, media_type=media_type)
+
+@router.get("/api/ready")
+async def readiness_check():
+    """Readiness probe: 503 finché l'avvio non è completato, poi il tempo di avvio"""
+    if startup_seconds is None:
+        raise HTTPException(status_code=503, detail="Avvio in corso")
+    return FastJSONResponse({"status": "ready", "startup_seconds": round(startup_seconds, 3)})
+
+def _format_errors(errors: List[dict]) -> str:
+    """Errori di validazione in una riga leggibile per le risposte batch"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in errors
+    )
+
+_BINARY_REQUEST_BODY = {ANSWERS_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}
+_BINARY_RESPONSE = {200: {"content": {RESULT_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}}}
 
-@app.post("/api/questionnaire/submit", response_model=QuestionnaireResult)
-async def submit_questionnaire(submission: QuestionnaireSubmission):
+@router.post(
+    "/api/questionnaire/submit",
+    response_model=QuestionnaireResult,
+    responses={400: {"description": "Questionario incompleto o risposte non valide"}, **_BINARY_RESPONSE},
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": TypedQuestionnaireSubmission.model_json_schema()},
+            **_BINARY_REQUEST_BODY
+        }
+    }}
+)
+async def submit_questionnaire(request: Request):
     """
     Elabora le risposte del questionario e restituisce la classificazione
+
+    Validazione, classificazione e serializzazione sono eseguite qui (invece che
+    da FastAPI) per misurarne i tempi separatamente. Le risposte sono validate
+    in un solo passaggio dal modello tipizzato: un questionario incompleto o con
+    valori non ammessi viene rifiutato con 400 prima della classificazione.
+    Accetta e restituisce anche la codifica binaria compatta (backend/binary_codec.py).
     """
-    try:
-        # Valida che ci siano abbastanza risposte
-        if len(submission.answers) < 20:
+    body = await request.body()
+    started = perf_counter()
+    timestamp = None
+    if is_binary_request(request.headers.get("content-type")):
+        try:
+            (vector,) = decode_answers(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"È richiesto un record di {RECORD_SIZE} byte.")
+        if vector is None:
+            raise HTTPException(status_code=400, detail="Risposte non valide: valore fuori intervallo.")
+    else:
+        try:
+            submission = TypedQuestionnaireSubmission.model_validate_json(body)
+        except ValidationError as e:
             raise HTTPException(
-                status_code=400, 
-                detail="Questionario incompleto. Sono richieste risposte a tutte le 20 domande."
+                status_code=400,
+                detail=jsonable_encoder([
+                    {**error, "loc": ["body", *error["loc"]]}
+                    for error in e.errors(include_url=False, include_context=False)
+                ])
             )
-        
-        # Classifica il tipo di occhio secco
-        result = classify_dry_eye(submission.answers)
-        
-        return result
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Errore nei dati forniti: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Errore interno del server: {str(e)}")
-
-@app.get("/api/questionnaire/questions")
-async def get_questions():
+        vector, timestamp = submission.answers, submission.timestamp
+    validated = perf_counter()
+    STAGE_TIMERS["validation"].observe(validated - started)
+
+    # Classifica il tipo di occhio secco
+    result = classify_submission(vector)
+    STAGE_TIMERS["classification"].observe(perf_counter() - validated)
+    record_result(vector, result)
+
+    await store_submission(vector, result, timestamp)
+
+    serialization_started = perf_counter()
+    if wants_binary_response(request.headers.get("accept")):
+        response = Response(content=encode_result(result), media_type=RESULT_MEDIA_TYPE)
+    else:
+        response = Response(content=result.__pydantic_serializer__.to_json(result), media_type="application/json")
+    STAGE_TIMERS["serialization"].observe(perf_counter() - serialization_started)
+    return response
+
+# Limite di sottomissioni per singola richiesta batch
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "5000"))
+
+_submission_list = TypeAdapter(List[TypedQuestionnaireSubmission])
+
+def _check_batch_size(count: int) -> None:
+    if count > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Troppe sottomissioni nel batch (massimo {MAX_BATCH_SIZE})."
+        )
+
+def _parse_json_batch(body: bytes) -> Tuple[List[Optional[TypedQuestionnaireSubmission]], Dict[int, str]]:
+    """Sottomissioni JSON del batch (None se non valide) ed errori per indice"""
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Il corpo della richiesta non è JSON valido.")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="È richiesta una lista di questionari.")
+    _check_batch_size(len(items))
+
+    # Validazione dell'intera lista in un passaggio; solo in caso di errori
+    # gli elementi validi vengono rivalidati uno per uno
+    try:
+        return _submission_list.validate_python(items), {}
+    except ValidationError as e:
+        errors: Dict[int, List[dict]] = {}
+        for error in e.errors(include_url=False, include_context=False):
+            errors.setdefault(error["loc"][0], []).append({**error, "loc": error["loc"][1:]})
+        submissions = [
+            None if index in errors else TypedQuestionnaireSubmission.model_validate(item)
+            for index, item in enumerate(items)
+        ]
+        return submissions, {
+            index: f"Risposte non valide: {_format_errors(item_errors)}" for index, item_errors in errors.items()
+        }
+
+@router.post(
+    "/api/questionnaire/submit/batch",
+    response_model=BatchResult,
+    responses=_BINARY_RESPONSE,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": _submission_list.json_schema()}, **_BINARY_REQUEST_BODY}
+    }}
+)
+async def submit_questionnaire_batch(request: Request):
     """
-    Restituisce la struttura delle domande del questionario
+    Elabora più questionari in una sola richiesta (import notturni dalle cliniche).
+    I risultati sono restituiti nello stesso ordine dell'input; un questionario
+    non valido, o non archiviato perché la coda è piena, produce un errore sul
+    singolo elemento senza interrompere il batch.
     """
-    return {
-        "sections": [
-            {
-                "id": 1,
-                "title": "Sintomi Principali",
-                "description": "Valuta quanto spesso hai questi sintomi (da 0 = mai a 4 = sempre)",
-                "questions": [
-                    {"id": 1, "text": "I tuoi occhi ti sembrano secchi o irritati?", "type": "scale"},
-                    {"id": 2, "text": "Senti bruciore o pizzicore agli occhi?", "type": "scale"},
-                    {"id": 3, "text": "Hai sensazione di sabbia o corpo estraneo?", "type": "scale"},
-                    {"id": 4, "text": "Avverti fastidio alla luce (fotofobia)?", "type": "scale"},
-                    {"id": 5, "text": "La tua vista diventa offuscata nel corso della giornata?", "type": "scale"},
-                    {"id": 6, "text": "I tuoi occhi lacrimano spontaneamente?", "type": "scale"},
-                    {"id": 7, "text": "I sintomi peggiorano alla sera o dopo uso del computer?", "type": "scale"}
-                ]
-            },
-            {
-                "id": 2,
-                "title": "Fattori Predisponenti",
-                "description": "Rispondi Sì o No alle seguenti domande",
-                "questions": [
-                    {"id": 8, "text": "Usi frequentemente schermi (PC, tablet, smartphone)?", "type": "yesno"},
-                    {"id": 9, "text": "Indossi lenti a contatto?", "type": "yesno"},
-                    {"id": 10, "text": "Hai mai fatto un intervento agli occhi?", "type": "yesno"},
-                    {"id": 11, "text": "Hai una malattia autoimmune diagnosticata (es. Sjögren, lupus)?", "type": "yesno"},
-                    {"id": 12, "text": "Assumi farmaci per la pressione, depressione o antistaminici?", "type": "yesno"}
-                ]
-            },
-            {
-                "id": 3,
-                "title": "Risposte ai Trattamenti",
-                "description": "Indica se hai notato miglioramenti con questi trattamenti",
-                "questions": [
-                    {"id": 13, "text": "Noti miglioramento con lacrime artificiali?", "type": "yesno"},
-                    {"id": 14, "text": "Noti miglioramento dopo impacchi caldi?", "type": "yesno"},
-                    {"id": 15, "text": "I sintomi compaiono soprattutto al risveglio?", "type": "yesno"},
-                    {"id": 16, "text": "Hai provato lacrime più viscose o gel, con miglioramento?", "type": "yesno"}
-                ]
-            },
-            {
-                "id": 4,
-                "title": "Diagnostica Riferita",
-                "description": "Indica se conosci questi aspetti della tua condizione",
-                "questions": [
-                    {"id": 17, "text": "Ti hanno mai detto che hai un film lacrimale instabile?", "type": "yesno"},
-                    {"id": 18, "text": "Ti hanno mai fatto il test di Schirmer (carta sotto la palpebra)?", "type": "yesno"},
-                    {"id": 19, "text": "Sai se le tue ghiandole di Meibomio funzionano bene (MGD)?", "type": "yesno"},
-                    {"id": 20, "text": "I tuoi sintomi sono molto forti anche se all'esame l'occhio è 'normale'?", "type": "yesno"}
-                ]
-            }
+    body = await request.body()
+    if is_binary_request(request.headers.get("content-type")):
+        try:
+            vectors = decode_answers(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        _check_batch_size(len(vectors))
+        items = [(vector, None) if vector is not None else None for vector in vectors]
+        errors = {
+            index: "Risposte non valide: valore fuori intervallo."
+            for index, vector in enumerate(vectors) if vector is None
+        }
+    else:
+        submissions, errors = _parse_json_batch(body)
+        items = [
+            (submission.answers, submission.timestamp) if submission is not None else None
+            for submission in submissions
         ]
-    }
 
-@app.get("/api/questionnaire/info")
-async def get_questionnaire_info():
+    results = []
+    for index, item in enumerate(items):
+        if item is None:
+            results.append(BatchItemResult(index=index, error=errors[index]))
+            continue
+        vector, timestamp = item
+        result = classify_submission(vector)
+        record_result(vector, result)
+        try:
+            await store_submission(vector, result, timestamp)
+        except HTTPException as e:
+            # Come nello stream: i questionari precedenti sono già accodati, quindi
+            # l'errore è sul singolo elemento e il client ripete solo quelli non archiviati
+            results.append(BatchItemResult(index=index, result=result, error=e.detail))
+        else:
+            results.append(BatchItemResult(index=index, result=result))
+
+    if wants_binary_response(request.headers.get("accept")):
+        return Response(
+            content=b"".join(
+                encode_result(item.result) if item.error is None else encode_error() for item in results
+            ),
+            media_type=RESULT_MEDIA_TYPE
+        )
+    failed = sum(item.error is not None for item in results)
+    # Restituita come risposta: FastAPI non rivalida né converte in dizionari i risultati
+    return FastJSONResponse(BatchResult(
+        total=len(items),
+        succeeded=len(items) - failed,
+        failed=failed,
+        results=results
+    ))
+
+# Lunghezza massima di una riga del flusso NDJSON (un questionario)
+MAX_STREAM_LINE_BYTES = int(os.environ.get("MAX_STREAM_LINE_BYTES", "65536"))
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """
+    Righe non vuote del corpo in streaming; in memoria resta solo la riga
+    corrente. Una riga oltre MAX_STREAM_LINE_BYTES produce b"" e viene scartata.
+    """
+    pending = b""
+    discarding = False
+    async for chunk in request.stream():
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            if discarding:
+                discarding = False
+            elif len(line) > MAX_STREAM_LINE_BYTES:
+                yield b""
+            elif line.strip():
+                yield line
+        if discarding or len(pending) > MAX_STREAM_LINE_BYTES:
+            if not discarding:
+                yield b""
+            discarding = True
+            pending = b""
+    if pending.strip() and not discarding:
+        yield pending
+
+async def _classify_stream(request: Request) -> AsyncIterator[bytes]:
+    """Una riga BatchItemResult per ogni questionario in ingresso, nello stesso ordine"""
+    serializer = BatchItemResult.__pydantic_serializer__
+    index = 0
+    async for line in _ndjson_lines(request):
+        if not line:
+            item = BatchItemResult(index=index, error=f"Riga oltre {MAX_STREAM_LINE_BYTES} byte.")
+        else:
+            try:
+                submission = TypedQuestionnaireSubmission.model_validate_json(line)
+            except ValidationError as e:
+                item = BatchItemResult(
+                    index=index,
+                    error=f"Risposte non valide: {_format_errors(e.errors(include_url=False))}"
+                )
+            else:
+                result = classify_submission(submission.answers)
+                record_result(submission.answers, result)
+                item = BatchItemResult(index=index, result=result)
+                try:
+                    # Con la coda di archiviazione piena l'attesa rallenta la lettura dell'upload
+                    await store_submission(submission.answers, result, submission.timestamp)
+                except HTTPException as e:
+                    item = BatchItemResult(index=index, result=result, error=e.detail)
+        yield serializer.to_json(item) + b"\n"
+        index += 1
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse che invia la risposta mentre il corpo della richiesta è
+    ancora in lettura. Quella di Starlette consuma `receive` in parallelo per
+    rilevare la disconnessione e sottrarrebbe i blocchi dell'upload; qui la
+    disconnessione emerge da request.stream() (ClientDisconnect).
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@router.post(
+    "/api/questionnaire/submit/stream",
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {"schema": BatchItemResult.model_json_schema()}}}},
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {NDJSON_MEDIA_TYPE: {"schema": TypedQuestionnaireSubmission.model_json_schema()}}
+    }}
+)
+async def submit_questionnaire_stream(request: Request):
+    """
+    Import di grandi dimensioni: il corpo è NDJSON, un questionario per riga, e
+    la risposta è NDJSON con un BatchItemResult per riga, prodotto man mano che
+    l'upload viene letto. La memoria usata non dipende dalla dimensione del
+    file e non c'è limite al numero di righe (a differenza di /submit/batch).
+    Il client deve leggere la risposta mentre invia il corpo (full duplex).
+    """
+    return DuplexStreamingResponse(_classify_stream(request), media_type=NDJSON_MEDIA_TYPE)
+
+@router.get("/api/questionnaire/stats")
+async def get_aggregate_stats():
+    """
+    Distribuzione dei tipi di risultato, istogrammi dei punteggi e frequenze
+    delle risposte, dai contatori in memoria sommati agli snapshot degli altri
+    worker (tempo costante rispetto al numero di sottomissioni)
+    """
+    if aggregate_snapshots is not None:
+        return FastJSONResponse(await aggregate_snapshots.merged())
+    return FastJSONResponse({**aggregate_stats.snapshot(), "workers": 1})
+
+@router.get("/api/questionnaire/cache/stats")
+async def get_cache_stats():
+    """Statistiche della cache dei risultati (hit, miss, eviction) e della cache condivisa"""
+    shared = {"enabled": False} if shared_cache is None else {"enabled": True, **shared_cache.stats()}
+    return FastJSONResponse({**result_cache.stats(), "shared": shared})
+
+@router.get("/api/questionnaire/lookup/stats")
+async def get_lookup_stats():
+    """Rapporto sulla tabella precalcolata (tempo di avvio, memoria)"""
+    if lookup_table is None:
+        return FastJSONResponse({"enabled": False})
+    return FastJSONResponse({"enabled": True, **lookup_table.report()})
+
+@router.get("/api/questionnaire/admission/stats")
+async def get_admission_stats():
+    """Richieste respinte per route (429/503), posti occupati e in attesa"""
+    if admission_controller is None:
+        return FastJSONResponse({"enabled": False})
+    return FastJSONResponse({"enabled": True, **admission_controller.stats()})
+
+@router.get("/api/questionnaire/storage/stats")
+async def get_storage_stats():
+    """Stato della coda di archiviazione delle sottomissioni"""
+    if submission_writer is None:
+        return FastJSONResponse({"enabled": False})
+    return FastJSONResponse({"enabled": True, **submission_writer.stats()})
+
+# Contenuti statici: serializzati e compressi una sola volta all'avvio
+STATIC_CACHE_MAX_AGE = int(os.environ.get("STATIC_CACHE_MAX_AGE", "3600"))
+
+QUESTIONS_PAYLOAD = {
+    "sections": [
+        {
+            "id": 1,
+            "title": "Sintomi Principali",
+            "description": "Valuta quanto spesso hai questi sintomi (da 0 = mai a 4 = sempre)",
+            "questions": [
+                {"id": 1, "text": "I tuoi occhi ti sembrano secchi o irritati?", "type": "scale"},
+                {"id": 2, "text": "Senti bruciore o pizzicore agli occhi?", "type": "scale"},
+                {"id": 3, "text": "Hai sensazione di sabbia o corpo estraneo?", "type": "scale"},
+                {"id": 4, "text": "Avverti fastidio alla luce (fotofobia)?", "type": "scale"},
+                {"id": 5, "text": "La tua vista diventa offuscata nel corso della giornata?", "type": "scale"},
+                {"id": 6, "text": "I tuoi occhi lacrimano spontaneamente?", "type": "scale"},
+                {"id": 7, "text": "I sintomi peggiorano alla sera o dopo uso del computer?", "type": "scale"}
+            ]
+        },
+        {
+            "id": 2,
+            "title": "Fattori Predisponenti",
+            "description": "Rispondi Sì o No alle seguenti domande",
+            "questions": [
+                {"id": 8, "text": "Usi frequentemente schermi (PC, tablet, smartphone)?", "type": "yesno"},
+                {"id": 9, "text": "Indossi lenti a contatto?", "type": "yesno"},
+                {"id": 10, "text": "Hai mai fatto un intervento agli occhi?", "type": "yesno"},
+                {"id": 11, "text": "Hai una malattia autoimmune diagnosticata (es. Sjögren, lupus)?", "type": "yesno"},
+                {"id": 12, "text": "Assumi farmaci per la pressione, depressione o antistaminici?", "type": "yesno"}
+            ]
+        },
+        {
+            "id": 3,
+            "title": "Risposte ai Trattamenti",
+            "description": "Indica se hai notato miglioramenti con questi trattamenti",
+            "questions": [
+                {"id": 13, "text": "Noti miglioramento con lacrime artificiali?", "type": "yesno"},
+                {"id": 14, "text": "Noti miglioramento dopo impacchi caldi?", "type": "yesno"},
+                {"id": 15, "text": "I sintomi compaiono soprattutto al risveglio?", "type": "yesno"},
+                {"id": 16, "text": "Hai provato lacrime più viscose o gel, con miglioramento?", "type": "yesno"}
+            ]
+        },
+        {
+            "id": 4,
+            "title": "Diagnostica Riferita",
+            "description": "Indica se conosci questi aspetti della tua condizione",
+            "questions": [
+                {"id": 17, "text": "Ti hanno mai detto che hai un film lacrimale instabile?", "type": "yesno"},
+                {"id": 18, "text": "Ti hanno mai fatto il test di Schirmer (carta sotto la palpebra)?", "type": "yesno"},
+                {"id": 19, "text": "Sai se le tue ghiandole di Meibomio funzionano bene (MGD)?", "type": "yesno"},
+                {"id": 20, "text": "I tuoi sintomi sono molto forti anche se all'esame l'occhio è 'normale'?", "type": "yesno"}
+            ]
+        }
+    ]
+}
+
+QUESTIONNAIRE_INFO_PAYLOAD = {
+    "title": "Questionario per la Classificazione dell'Occhio Secco",
+    "description": "Questo questionario ti aiuterà a identificare il tipo di occhio secco che potresti avere.",
+    "total_questions": 20,
+    "sections": 4,
+    "estimated_time": "5-10 minuti",
+    "disclaimer": "Questo risultato non sostituisce una valutazione medica. Porta con te questo risultato alla visita oculistica."
+}
+
+_questions_response = PrecompressedPayload(QUESTIONS_PAYLOAD, max_age=STATIC_CACHE_MAX_AGE, cache=shared_cache)
+_info_response = PrecompressedPayload(QUESTIONNAIRE_INFO_PAYLOAD, max_age=STATIC_CACHE_MAX_AGE, cache=shared_cache)
+
+@router.get("/api/questionnaire/questions")
+async def get_questions(request: Request):
+    """
+    Restituisce la struttura delle domande del questionario
+    """
+    return _questions_response.response(request)
+
+@router.get("/api/questionnaire/info")
+async def get_questionnaire_info(request: Request):
     """
     Restituisce informazioni generali sul questionario
     """
-    return {
-        "title": "Questionario per la Classificazione dell'Occhio Secco",
-        "description": "Questo questionario ti aiuterà a identificare il tipo di occhio secco che potresti avere.",
-        "total_questions": 20,
-        "sections": 4,
-        "estimated_time": "5-10 minuti",
-        "disclaimer": "Questo risultato non sostituisce una valutazione medica. Porta con te questo risultato alla visita oculistica."
-    }
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    return _info_response.response(request)
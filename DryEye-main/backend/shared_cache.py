@@ -0,0 +1,252 @@
+"""
+Cache condivisa tra i worker (Redis), opzionale, dietro la cache L1 in processo.
+
+- Risultati di classificazione: a ogni miss della cache L1 (ResultCache) il
+  risultato calcolato viene accodato e scritto in Redis a lotti, con una
+  pipeline, da un task di background (mai sul percorso della richiesta). Un
+  worker che parte carica in L1 i risultati già presenti (SCAN + MGET a
+  lotti), invece di riscaldare la cache da zero. Il valore è il record di 4
+  byte di backend/binary_codec.py; la chiave include l'impronta delle regole,
+  così un deploy con regole diverse non legge risultati obsoleti.
+- Payload statici pre-serializzati: le varianti compresse (gzip, br) sono
+  lette da Redis all'avvio invece di essere ricompresse da ogni worker.
+
+Tutte le chiavi hanno un TTL (SHARED_CACHE_TTL, predefinito 1 giorno). Se
+Redis non risponde il backend continua con la sola L1 e riprova dopo
+SHARED_CACHE_RETRY secondi.
+
+REDIS_URL attiva la cache (es. redis://localhost:6379/0); REDIS_URL=memory://
+usa MemoryRedis, un sostituto in memoria per test e sviluppo locale.
+"""
+import asyncio
+import fnmatch
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.external_integrations import require
+from backend.lookup_table import rules_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryRedis:
+    """Sostituto in memoria del sottoinsieme di redis-py usato da SharedCache"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+
+    def _get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: str, value: bytes, ex: Optional[float] = None) -> bool:
+        self._data[key] = (bytes(value), time.monotonic() + ex if ex else None)
+        return True
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        return [self._get(key) for key in keys]
+
+    def scan_iter(self, match: str = "*", count: int = 100):
+        for key in list(self._data):
+            if fnmatch.fnmatchcase(key, match) and self._get(key) is not None:
+                yield key.encode()
+
+    def pipeline(self, transaction: bool = False) -> "_MemoryPipeline":
+        return _MemoryPipeline(self)
+
+    def close(self) -> None:
+        pass
+
+
+class _MemoryPipeline:
+    def __init__(self, client: MemoryRedis):
+        self._client = client
+        self._commands = []
+
+    def set(self, *args, **kwargs) -> "_MemoryPipeline":
+        self._commands.append((self._client.set, args, kwargs))
+        return self
+
+    def mget(self, *args, **kwargs) -> "_MemoryPipeline":
+        self._commands.append((self._client.mget, args, kwargs))
+        return self
+
+    def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+class SharedCache:
+    """Livello L2 su Redis con scritture a lotti e ripiego sulla sola L1"""
+
+    def __init__(self, client, prefix: str = "dryeye", ttl: int = 86400, batch_size: int = 500,
+                 flush_interval: float = 1.0, retry_interval: float = 30.0, max_pending: int = 10000):
+        self.client = client
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_pending = max_pending
+        self._result_prefix = f"{prefix}:r:{rules_fingerprint().hex()}:"
+        self._payload_prefix = f"{prefix}:p:"
+        self._pending: Dict[int, bytes] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._down_until = 0.0
+        self.loaded = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, operation: str) -> None:
+        self.errors += 1
+        self._down_until = time.monotonic() + self.retry_interval
+        logger.warning("Cache condivisa non raggiungibile (%s): solo cache locale per %.0fs",
+                       operation, self.retry_interval, exc_info=True)
+
+    # Risultati di classificazione
+
+    def put_result(self, key: int, value: bytes) -> None:
+        """Accoda un risultato per la prossima scrittura a lotti (nessun I/O)"""
+        if len(self._pending) < self.max_pending:
+            self._pending[key] = value
+        else:
+            self.dropped += 1
+
+    def write_results(self, items: List[Tuple[int, bytes]]) -> None:
+        """Scrive i risultati con una pipeline per ogni lotto di batch_size chiavi"""
+        if not items or not self.available:
+            self.dropped += len(items)
+            return
+        try:
+            for i in range(0, len(items), self.batch_size):
+                pipeline = self.client.pipeline(transaction=False)
+                for key, value in items[i:i + self.batch_size]:
+                    pipeline.set(self._result_prefix + str(key), value, ex=self.ttl)
+                pipeline.execute()
+                self.written += len(items[i:i + self.batch_size])
+        except Exception:
+            self.dropped += len(items)
+            self._failed("scrittura risultati")
+
+    def load_results(self, limit: int) -> List[Tuple[int, bytes]]:
+        """Fino a `limit` risultati già in Redis (SCAN + MGET in pipeline), per riempire la L1"""
+        if limit <= 0 or not self.available:
+            return []
+        results: List[Tuple[int, bytes]] = []
+        try:
+            keys: List[str] = []
+            for key in self.client.scan_iter(match=self._result_prefix + "*", count=self.batch_size):
+                keys.append(key.decode() if isinstance(key, bytes) else key)
+                if len(keys) >= limit:
+                    break
+            batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+            pipeline = self.client.pipeline(transaction=False)
+            for batch in batches:
+                pipeline.mget(batch)
+            for batch, values in zip(batches, pipeline.execute()):
+                for key, value in zip(batch, values):
+                    if value is not None:
+                        results.append((int(key[len(self._result_prefix):]), value))
+        except Exception:
+            self._failed("lettura risultati")
+            return []
+        self.loaded += len(results)
+        return results
+
+    # Payload statici
+
+    def _payload_key(self, etag: str, encoding: str) -> str:
+        return f"{self._payload_prefix}{etag.strip(chr(34))}:{encoding}"
+
+    def load_variants(self, etag: str, encodings: Iterable[str]) -> Optional[Dict[str, bytes]]:
+        """Varianti compresse del payload `etag`, solo se sono presenti tutte"""
+        encodings = list(encodings)
+        if not self.available:
+            return None
+        try:
+            values = self.client.mget([self._payload_key(etag, e) for e in encodings])
+        except Exception:
+            self._failed("lettura payload")
+            return None
+        if any(value is None for value in values):
+            return None
+        return dict(zip(encodings, values))
+
+    def store_variants(self, etag: str, variants: Dict[str, bytes]) -> None:
+        if not self.available:
+            return
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for encoding, body in variants.items():
+                pipeline.set(self._payload_key(etag, encoding), body, ex=self.ttl)
+            pipeline.execute()
+        except Exception:
+            self._failed("scrittura payload")
+
+    # Task di scrittura
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Scrive i risultati ancora in coda e chiude la connessione"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._flush()
+        await asyncio.to_thread(self.client.close)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if self._pending:
+            items, self._pending = list(self._pending.items()), {}
+            await asyncio.to_thread(self.write_results, items)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "available": self.available,
+            "pending": len(self._pending),
+            "loaded": self.loaded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+def shared_cache_from_env() -> Optional[SharedCache]:
+    """Crea la cache da REDIS_URL e SHARED_CACHE_*; None se REDIS_URL non è impostato"""
+    url = os.environ.get("REDIS_URL")
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        client = MemoryRedis()
+    else:
+        redis = require("redis", "REDIS_URL")
+        timeout = float(os.environ.get("REDIS_TIMEOUT", "0.25"))
+        client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+    return SharedCache(
+        client,
+        prefix=os.environ.get("SHARED_CACHE_PREFIX", "dryeye"),
+        ttl=int(os.environ.get("SHARED_CACHE_TTL", "86400")),
+        retry_interval=float(os.environ.get("SHARED_CACHE_RETRY", "30")),
+    )
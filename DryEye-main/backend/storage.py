@@ -0,0 +1,222 @@
+"""
+Archiviazione asincrona delle sottomissioni per audit.
+
+Gli endpoint accodano ogni sottomissione (risposte + risultato) in una coda
+asyncio limitata; un task in background raccoglie i record e li scrive in
+blocco (group commit) quando il lotto è pieno o allo scadere dell'intervallo
+di flush. Se la coda è piena l'accodamento attende fino a un timeout e poi
+solleva StorageBusyError, così il carico viene respinto invece di crescere
+senza limiti in memoria.
+
+Backend disponibili:
+- sqlite: file locale, nessun servizio esterno (predefinito)
+- mongo: MongoDB tramite pymongo (MONGO_URL, DB_NAME)
+- none: archiviazione disattivata
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from backend.external_integrations import require
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBusyError(Exception):
+    """La coda di scrittura è piena"""
+
+
+# Segnale di arresto per il task di scrittura, accodato da SubmissionWriter.stop()
+_STOP = object()
+
+
+class SQLiteBackend:
+    """Scrive i lotti in un file SQLite con una sola transazione per lotto"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                submitted_at TEXT,
+                received_at TEXT NOT NULL,
+                answers TEXT NOT NULL,
+                result_type TEXT NOT NULL,
+                scores TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO submissions (submitted_at, received_at, answers, result_type, scores) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        r["submitted_at"],
+                        r["received_at"],
+                        json.dumps(r["answers"], separators=(",", ":")),
+                        r["type"],
+                        json.dumps(r["scores"], separators=(",", ":")),
+                    )
+                    for r in records
+                ],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class MongoBackend:
+    """Scrive i lotti in MongoDB con insert_many non ordinato"""
+
+    def __init__(self, url: str, db_name: str, collection: str = "submissions"):
+        pymongo = require("pymongo", "STORAGE_BACKEND=mongo")
+        self._client = pymongo.MongoClient(url)
+        self._collection = self._client[db_name][collection]
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        self._collection.insert_many([dict(r) for r in records], ordered=False)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class SubmissionWriter:
+    """Coda asyncio con scrittura a lotti in un task di background"""
+
+    def __init__(self, backend, batch_size: int = 100, flush_interval: float = 0.5,
+                 queue_size: int = 10000, enqueue_timeout: float = 1.0):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Scrive il lotto in corso e i record ancora in coda, poi chiude il backend"""
+        if self._task is not None:
+            # Il segnale di arresto arriva dopo i record già accodati: il task
+            # scrive il lotto che sta riempiendo e termina da solo
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+        if self._queue is not None:
+            remaining = []
+            while not self._queue.empty():
+                remaining.append(self._queue.get_nowait())
+            for i in range(0, len(remaining), self.batch_size):
+                await self._write(remaining[i:i + self.batch_size])
+        await asyncio.to_thread(self.backend.close)
+
+    async def enqueue(self, record: Dict[str, Any]) -> None:
+        """Accoda un record; con la coda piena attende al massimo enqueue_timeout secondi"""
+        if self._queue is None:
+            raise RuntimeError("SubmissionWriter non avviato")
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(record), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                raise StorageBusyError("Coda di archiviazione piena")
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            record = await queue.get()
+            if record is _STOP:
+                return
+            batch = [record]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        record = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    record = queue.get_nowait()
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]], attempts: int = 3) -> None:
+        for attempt in range(1, attempts + 1):
+            try:
+                await asyncio.to_thread(self.backend.write_batch, batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception:
+                if attempt == attempts:
+                    self.failed += len(batch)
+                    logger.exception("Scrittura di %d sottomissioni fallita", len(batch))
+                    return
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+def make_record(answers: Dict[str, str], result, submitted_at: Optional[datetime]) -> Dict[str, Any]:
+    """Record di audit per una sottomissione classificata"""
+    return {
+        "submitted_at": submitted_at.isoformat() if submitted_at else None,
+        "received_at": datetime.now(timezone.utc).isoformat(),
+        "answers": answers,
+        "type": result.type,
+        "scores": result.scores,
+    }
+
+
+def writer_from_env() -> Optional[SubmissionWriter]:
+    """Crea il writer dalle variabili d'ambiente STORAGE_*; None se disattivato"""
+    kind = os.environ.get("STORAGE_BACKEND", "sqlite").lower()
+    if kind == "none":
+        return None
+    if kind == "sqlite":
+        backend = SQLiteBackend(os.environ.get("STORAGE_SQLITE_PATH", "submissions.db"))
+    elif kind == "mongo":
+        backend = MongoBackend(os.environ["MONGO_URL"], os.environ.get("DB_NAME", "dry_eye"))
+    else:
+        raise ValueError(f"STORAGE_BACKEND non supportato: {kind}")
+    return SubmissionWriter(
+        backend,
+        batch_size=int(os.environ.get("STORAGE_BATCH_SIZE", "100")),
+        flush_interval=float(os.environ.get("STORAGE_FLUSH_INTERVAL", "0.5")),
+        queue_size=int(os.environ.get("STORAGE_QUEUE_SIZE", "10000")),
+        enqueue_timeout=float(os.environ.get("STORAGE_ENQUEUE_TIMEOUT", "1.0")),
+    )
@@ -0,0 +1,90 @@
+"""
+Motore di punteggio vettoriale (NumPy) per grandi volumi di questionari.
+
+Le risposte vengono codificate in una matrice intera N×20 (una riga per
+questionario, una colonna per domanda) e i punteggi sono calcolati con
+prodotti matrice-vettore e maschere booleane. I risultati coincidono con
+quelli di `classify_dry_eye` in server.py.
+"""
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from backend.rules import (
+    PUBLIC_SCORES,
+    RESULT_TYPES,
+    SCALE_QUESTIONS,
+    SCORE_WEIGHTS,
+    compile_conditions,
+)
+
+QUESTION_COUNT = 20
+YESNO_QUESTIONS = range(8, QUESTION_COUNT + 1)   # sì/no: 1 nella matrice
+
+
+def _weights(weights: Dict[int, int]) -> np.ndarray:
+    """Vettore pesi di un punteggio a partire dalla tabella in rules.py"""
+    vector = np.zeros(QUESTION_COUNT, dtype=np.int64)
+    for q, weight in weights.items():
+        vector[q - 1] = weight
+    return vector
+
+
+# Matrice pesi 20×K: una colonna per ciascun punteggio di SCORE_WEIGHTS
+WEIGHT_MATRIX = np.stack([_weights(w) for w in SCORE_WEIGHTS.values()], axis=1)
+_RULES = compile_conditions(tuple(SCORE_WEIGHTS))
+
+_SCALE_KEYS = [str(q) for q in SCALE_QUESTIONS]
+_YESNO_KEYS = [str(q) for q in YESNO_QUESTIONS]
+
+
+def encode_answers(answer_sets: Iterable[Dict[str, str]]) -> np.ndarray:
+    """
+    Codifica i questionari in una matrice N×20.
+
+    Le domande 1-7 sono convertite con int() (risposta mancante = 0), le
+    domande 8-20 valgono 1 se la risposta è 'si' e 0 altrimenti. Una risposta
+    scala non numerica solleva ValueError come nella funzione scalare.
+    """
+    flat: List[int] = []
+    append = flat.append
+    for answers in answer_sets:
+        get = answers.get
+        for key in _SCALE_KEYS:
+            append(int(get(key, '0')))
+        for key in _YESNO_KEYS:
+            append(1 if get(key) == 'si' else 0)
+    return np.array(flat, dtype=np.int64).reshape(-1, QUESTION_COUNT)
+
+
+def score_matrix(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcola i punteggi e la classificazione per una matrice N×20.
+
+    Restituisce (evaporative_score, aqueous_score, total_symptoms, type_index),
+    dove type_index indicizza RESULT_TYPES.
+    """
+    scores = matrix @ WEIGHT_MATRIX
+    columns = [scores[:, i] for i in range(scores.shape[1])]
+
+    masks = []
+    for conditions in _RULES[:-1]:
+        mask = np.ones(len(matrix), dtype=bool)
+        for left, op, right, right_is_score in conditions:
+            mask &= op(columns[left], columns[right] if right_is_score else right)
+        masks.append(mask)
+    type_index = np.select(masks, range(len(masks)), default=len(_RULES) - 1)
+
+    evaporative, aqueous, total = columns[:len(PUBLIC_SCORES)]
+    return evaporative, aqueous, total, type_index
+
+
+def iter_results(answer_sets: Iterable[Dict[str, str]]) -> Iterator[Tuple[str, Dict[str, int]]]:
+    """Restituisce (tipo, punteggi) per ogni questionario, nello stesso formato di QuestionnaireResult"""
+    evaporative, aqueous, total, type_index = score_matrix(encode_answers(answer_sets))
+    for e, a, t, i in zip(evaporative.tolist(), aqueous.tolist(), total.tolist(), type_index.tolist()):
+        yield RESULT_TYPES[i], {
+            "evaporativeScore": e,
+            "aqueousScore": a,
+            "totalSymptoms": t
+        }
@@ -0,0 +1,158 @@
+"""
+Benchmark per route della serializzazione JSON (backend/fast_json.py).
+
+Per ogni route l'applicazione `backend.app:app` viene chiamata direttamente
+come ASGI, senza rete né client HTTP, così il tempo misurato è quello della
+route e della costruzione della risposta. Lo stesso benchmark è eseguito in
+due processi, con FAST_JSON_ENABLED=0 (jsonable_encoder + json.dumps, come
+FastAPI) e FAST_JSON_ENABLED=1, e per ogni route è riportato il guadagno.
+
+Con FAST_JSON_ENABLED=0 le route che restituiscono un modello non passano
+più dalla rivalidazione di response_model: il guadagno rispetto al percorso
+originale di FastAPI è quindi sottostimato per /submit/batch.
+
+Esempio (dalla cartella DryEye-main):
+    python -m benchmarks.json_routes --output json_routes.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.load_test import PROJECT_ROOT, SUBMIT_ANSWERS, git_revision
+
+BATCH_SIZE = 100
+
+# nome -> (metodo, percorso, corpo JSON)
+ROUTES = {
+    "health": ("GET", "/api/health", None),
+    "ready": ("GET", "/api/ready", None),
+    "questions": ("GET", "/api/questionnaire/questions", None),
+    "stats": ("GET", "/api/questionnaire/stats", None),
+    "cache_stats": ("GET", "/api/questionnaire/cache/stats", None),
+    "submit": ("POST", "/api/questionnaire/submit", {"answers": SUBMIT_ANSWERS}),
+    "submit_batch": ("POST", "/api/questionnaire/submit/batch", [{"answers": SUBMIT_ANSWERS}] * BATCH_SIZE),
+}
+
+
+async def call(app, method: str, path: str, body: bytes) -> Tuple[int, int]:
+    """Una richiesta ASGI completa; (status, byte del corpo della risposta)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    sent = False
+    status, size = 0, 0
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, size
+
+
+async def measure_routes(iterations: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Microsecondi per richiesta (minimo su `repeat` ripetizioni) per ogni route"""
+    from backend.app import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        for name, (method, path, payload) in ROUTES.items():
+            body = json.dumps(payload).encode() if payload is not None else b""
+            status, size = await call(app, method, path, body)
+            if status != 200:
+                raise RuntimeError(f"{method} {path}: status {status}")
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    await call(app, method, path, body)
+                runs.append((time.perf_counter() - started) / iterations * 1e6)
+            results[name] = {"us_per_request": round(min(runs), 2), "response_bytes": size}
+    return results
+
+
+def run_child(fast_json: bool, iterations: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Esegue il benchmark in un processo separato con FAST_JSON_ENABLED impostato"""
+    env = {
+        **os.environ,
+        "FAST_JSON_ENABLED": "1" if fast_json else "0",
+        "STORAGE_BACKEND": "none",
+        "ADMISSION_ENABLED": "0",
+    }
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.json_routes", "--child",
+         "--iterations", str(iterations), "--repeat", str(repeat)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(process.stdout)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark per route della serializzazione JSON")
+    parser.add_argument("--iterations", type=int, default=2000, help="richieste per ripetizione")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="file JSON dove salvare i risultati")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(measure_routes(args.iterations, args.repeat))))
+        return 0
+
+    default = run_child(False, args.iterations, args.repeat)
+    fast = run_child(True, args.iterations, args.repeat)
+    results = {}
+    print(f"{'route':<14} {'predefinito':>12} {'fast_json':>12} {'guadagno':>9}")
+    for name in ROUTES:
+        before, after = default[name]["us_per_request"], fast[name]["us_per_request"]
+        results[name] = {
+            "default_us": before,
+            "fast_us": after,
+            "speedup": round(before / after, 2),
+            "response_bytes": fast[name]["response_bytes"],
+        }
+        print(f"{name:<14} {before:>10.1f}µs {after:>10.1f}µs {before / after:>8.2f}x")
+
+    if args.output:
+        run = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "iterations": args.iterations,
+                "batch_size": BATCH_SIZE,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Load test riproducibile delle API del questionario.
+
+Avvia localmente `backend.app:app` (API e pagine HTML) con uvicorn su una
+porta libera, oppure usa un server già in esecuzione (--api-url), e per
+ciascun endpoint invia richieste con N client
+concorrenti per una durata fissa. Riporta richieste/secondo e latenze
+p50/p95/p99 e salva i risultati in JSON; con --compare confronta con un run
+precedente e termina con codice 1 in caso di regressione.
+
+Esempio (dalla cartella DryEye-main):
+    python -m benchmarks.load_test --concurrency 16 --duration 10 --output run.json
+    python -m benchmarks.load_test --compare run.json --tolerance 0.10
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import requests
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUBMIT_ANSWERS = {str(i): "3" for i in range(1, 8)}
+SUBMIT_ANSWERS.update({str(i): "si" if i in (14, 19, 20) else "no" for i in range(8, 21)})
+
+# nome -> (metodo, percorso, argomenti per requests)
+SCENARIOS = {
+    "health": ("GET", "/api/health", {}),
+    "questions": ("GET", "/api/questionnaire/questions", {"headers": {"Accept-Encoding": "gzip"}}),
+    "info": ("GET", "/api/questionnaire/info", {"headers": {"Accept-Encoding": "gzip"}}),
+    "submit": ("POST", "/api/questionnaire/submit", {"json": {"answers": SUBMIT_ANSWERS}}),
+    "submit_binary": ("POST", "/api/questionnaire/submit", {
+        "data": bytes([3] * 7 + [1 if i in (14, 19, 20) else 0 for i in range(8, 21)]),
+        "headers": {"Content-Type": "application/vnd.dryeye.answers", "Accept": "application/vnd.dryeye.result"}
+    }),
+    "questionario": ("GET", "/questionario", {"headers": {"Accept-Encoding": "gzip"}}),
+    "risultato": ("POST", "/risultato", {"data": SUBMIT_ANSWERS}),
+}
+
+# Applicazione avviata localmente e percorso di readiness
+LOCAL_APP = "backend.app:app"
+READY_PATH = "/api/ready"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(app: str, ready_path: str, timeout: float = 30.0):
+    """Avvia uvicorn in un sottoprocesso e attende che risponda"""
+    port = free_port()
+    # Senza archiviazione né rate limiting: tutte le richieste arrivano da 127.0.0.1
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": os.environ.get("STORAGE_BACKEND", "none"),
+        "ADMISSION_ENABLED": os.environ.get("ADMISSION_ENABLED", "0"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{app} terminato durante l'avvio")
+        try:
+            if requests.get(base_url + ready_path, timeout=1).ok:
+                return process, base_url
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"{app} non pronto dopo {timeout}s")
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(base_url: str, method: str, path: str, kwargs: Dict, concurrency: int,
+                 duration: float, warmup: float) -> Dict[str, float]:
+    """Esegue uno scenario con `concurrency` client per `duration` secondi"""
+    url = base_url + path
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_barrier = threading.Barrier(concurrency + 1)
+    state = {"measure_from": 0.0, "stop_at": 0.0}
+
+    def client(slot: int) -> None:
+        session = requests.Session()
+        start_barrier.wait()
+        record = latencies[slot]
+        while True:
+            started = time.perf_counter()
+            if started >= state["stop_at"]:
+                break
+            try:
+                ok = session.request(method, url, timeout=10, **kwargs).status_code < 400
+            except requests.RequestException:
+                ok = False
+            finished = time.perf_counter()
+            if started >= state["measure_from"]:
+                if ok:
+                    record.append(finished - started)
+                else:
+                    errors[slot] += 1
+        session.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(client, slot) for slot in range(concurrency)]
+        now = time.perf_counter()
+        state["measure_from"] = now + warmup
+        state["stop_at"] = now + warmup + duration
+        start_barrier.wait()
+        for future in futures:
+            future.result()
+
+    values = sorted(v for record in latencies for v in record)
+    return {
+        "requests": len(values),
+        "errors": sum(errors),
+        "rps": round(len(values) / duration, 1),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressioni: rps sotto (1 - tolerance) o p99 sopra (1 + tolerance) rispetto al baseline"""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if before["rps"] and result["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {before['rps']} -> {result['rps']}")
+        if before["p99_ms"] and result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {before['p99_ms']}ms -> {result['p99_ms']}ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test delle API del questionario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="scenari separati da virgola (%(default)s)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="secondi misurati per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="secondi di riscaldamento non misurati")
+    parser.add_argument("--api-url", help="usa un server già avviato invece di uno locale")
+    parser.add_argument("--output", help="file JSON dove salvare i risultati")
+    parser.add_argument("--compare", help="file JSON di un run precedente da confrontare")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="regressione massima tollerata")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"scenari sconosciuti: {', '.join(unknown)}")
+
+    base_url = args.api_url
+    process = None
+    try:
+        if not base_url:
+            process, base_url = start_local_server(LOCAL_APP, READY_PATH)
+
+        results = {}
+        for name in names:
+            method, path, kwargs = SCENARIOS[name]
+            results[name] = run_scenario(base_url, method, path, kwargs,
+                                         args.concurrency, args.duration, args.warmup)
+            r = results[name]
+            print(f"{name:<10} {r['rps']:>9.1f} req/s  p50 {r['p50_ms']:>8.3f}ms  "
+                  f"p95 {r['p95_ms']:>8.3f}ms  p99 {r['p99_ms']:>8.3f}ms  errori {r['errors']}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    run = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(run, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSIONE {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Microbenchmark delle singole fasi di una sottomissione.
+
+Misura separatamente, con timeit, su un corpus di questionari generati che
+copre tutti e cinque i rami della classificazione:
+- classify: classify_dry_eye da sola (senza cache)
+- result_construction: QuestionnaireResult dal modello precostruito (_build_result)
+- submission_validation: validazione di QuestionnaireSubmission da dict
+- submission_validation_json: validazione di QuestionnaireSubmission da bytes JSON
+- typed_validation_json: validazione di TypedQuestionnaireSubmission da bytes JSON
+- serialization: serializzazione del risultato in bytes JSON
+- serialization_jsonable: percorso predefinito FastAPI (jsonable_encoder + json.dumps)
+
+Esempio (dalla cartella DryEye-main):
+    python -m benchmarks.microbench --output micro.json
+    python -m benchmarks.microbench --compare micro.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.rules import PUBLIC_SCORES, RESULT_TYPES
+from backend.server import (
+    QuestionnaireResult,
+    QuestionnaireSubmission,
+    TypedQuestionnaireSubmission,
+    _build_result,
+    classify_dry_eye,
+)
+from benchmarks.load_test import git_revision
+
+
+def generate_corpus(per_type: int = 50, seed: int = 1234) -> List[Dict[str, str]]:
+    """Questionari completi casuali (seed fisso) con `per_type` esempi per ogni tipo di risultato"""
+    rng = random.Random(seed)
+    buckets: Dict[str, List[Dict[str, str]]] = {t: [] for t in RESULT_TYPES}
+    while any(len(bucket) < per_type for bucket in buckets.values()):
+        # Probabilità diverse per raggiungere anche i rami rari (neuropatico, misto)
+        high = rng.random() < 0.5
+        answers = {str(q): str(rng.randint(2 if high else 0, 4 if high else 2)) for q in range(1, 8)}
+        yes_rate = rng.choice((0.2, 0.5, 0.8))
+        answers.update({str(q): "si" if rng.random() < yes_rate else "no" for q in range(8, 21)})
+        bucket = buckets[classify_dry_eye(answers).type]
+        if len(bucket) < per_type:
+            bucket.append(answers)
+    corpus = [answers for bucket in buckets.values() for answers in bucket]
+    rng.shuffle(corpus)
+    return corpus
+
+
+def build_benchmarks(corpus: List[Dict[str, str]]) -> Dict[str, Callable[[], None]]:
+    """Funzioni da misurare: ciascuna elabora l'intero corpus una volta"""
+    results = [classify_dry_eye(answers) for answers in corpus]
+    indexed = [(RESULT_TYPES.index(r.type), tuple(r.scores[name] for name in PUBLIC_SCORES)) for r in results]
+    payloads = [{"answers": answers} for answers in corpus]
+    json_payloads = [json.dumps(payload).encode() for payload in payloads]
+    serializer = QuestionnaireResult.__pydantic_serializer__
+
+    def classify():
+        for answers in corpus:
+            classify_dry_eye(answers)
+
+    def result_construction():
+        for index, scores in indexed:
+            _build_result(index, scores)
+
+    def submission_validation():
+        for payload in payloads:
+            QuestionnaireSubmission.model_validate(payload)
+
+    def submission_validation_json():
+        for payload in json_payloads:
+            QuestionnaireSubmission.model_validate_json(payload)
+
+    def typed_validation_json():
+        for payload in json_payloads:
+            TypedQuestionnaireSubmission.model_validate_json(payload)
+
+    def serialization():
+        for result in results:
+            serializer.to_json(result)
+
+    def serialization_jsonable():
+        for result in results:
+            json.dumps(jsonable_encoder(result)).encode()
+
+    return {
+        "classify": classify,
+        "result_construction": result_construction,
+        "submission_validation": submission_validation,
+        "submission_validation_json": submission_validation_json,
+        "typed_validation_json": typed_validation_json,
+        "serialization": serialization,
+        "serialization_jsonable": serialization_jsonable,
+    }
+
+
+def measure(function: Callable[[], None], operations: int, repeat: int) -> Dict[str, float]:
+    """Tempo per operazione (ns): minimo e mediana su `repeat` ripetizioni"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    runs = sorted(t / (number * operations) * 1e9 for t in timer.repeat(repeat=repeat, number=number))
+    return {
+        "ns_per_op": round(runs[0], 1),
+        "median_ns_per_op": round(runs[len(runs) // 2], 1),
+        "ops_per_sec": round(1e9 / runs[0]),
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressioni: ns_per_op sopra (1 + tolerance) rispetto al baseline"""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before and result["ns_per_op"] > before["ns_per_op"] * (1 + tolerance):
+            regressions.append(f"{name}: {before['ns_per_op']}ns -> {result['ns_per_op']}ns")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark delle fasi di una sottomissione")
+    parser.add_argument("--per-type", type=int, default=50, help="questionari per tipo di risultato")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="benchmark separati da virgola")
+    parser.add_argument("--output", help="file JSON dove salvare i risultati")
+    parser.add_argument("--compare", help="file JSON di un run precedente da confrontare")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.per_type)
+    benchmarks = build_benchmarks(corpus)
+    if args.only:
+        selected = [name.strip() for name in args.only.split(",")]
+        benchmarks = {name: benchmarks[name] for name in selected}
+
+    results = {}
+    for name, function in benchmarks.items():
+        results[name] = measure(function, len(corpus), args.repeat)
+        r = results[name]
+        print(f"{name:<28} {r['ns_per_op']:>10.1f} ns/op  (mediana {r['median_ns_per_op']:.1f})"
+              f"  {r['ops_per_sec']:>10} op/s")
+
+    run = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus_size": len(corpus),
+            "corpus_per_type": args.per_type,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(run, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSIONE {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
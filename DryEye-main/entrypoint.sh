@@ -2,27 +2,68 @@
 set -e
 
 # Start the FastAPI backend
-cd /backend || { echo "Backend directory not found"; exit 1; }
+[ -d /backend ] || { echo "Backend directory not found"; exit 1; }
+# The backend is imported as the `backend` package, so run from its parent
+cd /
 
-echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
-BACKEND_PID=$!
+# SERVER_MODE=production runs gunicorn with one uvicorn worker per CPU
+# (WEB_CONCURRENCY overrides); SERVER_MODE=single keeps one uvicorn process
+SERVER_MODE=${SERVER_MODE:-production}
 
-echo "Waiting for backend to start..."
-sleep 30
+# nginx forwards the client address in X-Real-IP; rate limits key on it
+export ADMISSION_CLIENT_IP_HEADER=${ADMISSION_CLIENT_IP_HEADER:-X-Real-IP}
 
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
+echo "Starting FastAPI backend ($SERVER_MODE mode)"
+if [ "$SERVER_MODE" = "production" ]; then
+    # Shared directory so /metrics aggregates every worker
+    export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    # One aggregate-stats snapshot per worker slot, merged when /stats is read
+    # (not ${VAR:-default}: the "}" of {worker} would close the expansion)
+    if [ -z "$AGGREGATES_SNAPSHOT_PATH" ]; then
+        AGGREGATES_SNAPSHOT_PATH=/var/lib/dryeye/aggregates/worker-{worker}.json
+    fi
+    export AGGREGATES_SNAPSHOT_PATH
+    mkdir -p "$(dirname "$AGGREGATES_SNAPSHOT_PATH")"
+    gunicorn -c /backend/gunicorn_conf.py backend.app:app &
+else
+    # Start Uvicorn with proper host binding
+    uvicorn backend.app:app --host 0.0.0.0 --port 8001 &
 fi
+BACKEND_PID=$!
+
+# Poll the readiness endpoint with a short backoff instead of a fixed sleep
+READY_URL=${READY_URL:-http://127.0.0.1:8001/api/ready}
+READY_TIMEOUT=${READY_TIMEOUT:-60}
+echo "Waiting for backend to become ready at $READY_URL..."
+WAIT_STARTED=$(date +%s)
+DELAY=0.05
+until wget -q -O /dev/null "$READY_URL" 2>/dev/null; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ $(( $(date +%s) - WAIT_STARTED )) -ge "$READY_TIMEOUT" ]; then
+        echo "Backend not ready after ${READY_TIMEOUT}s, exiting"
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep $DELAY
+    case $DELAY in
+        0.05) DELAY=0.1 ;;
+        0.1) DELAY=0.25 ;;
+        *) DELAY=0.5 ;;
+    esac
+done
+echo "Backend ready after $(( $(date +%s) - WAIT_STARTED ))s: $(wget -q -O - "$READY_URL")"
 
 # Start Nginx
 nginx -g 'daemon off;' &
 NGINX_PID=$!
 
-# Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+# Handle termination signals: gunicorn drains its workers on TERM,
+# nginx finishes in-flight requests on QUIT
+trap 'kill -TERM $BACKEND_PID; kill -QUIT $NGINX_PID; wait $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
 
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
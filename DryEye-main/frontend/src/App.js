@@ -1,59 +1,79 @@
 import React, { useState } from 'react';
 import './App.css';
 
+// Domande incorporate in index.html da `python -m backend.preload` (nel
+// Dockerfile, con lo stesso backend dell'immagine): nessuna chiamata API
+function readPreloaded() {
+  const element = document.getElementById('questionnaire-preload');
+  if (!element) {
+    return null;
+  }
+  try {
+    return JSON.parse(element.textContent);
+  } catch (error) {
+    return null;
+  }
+}
+
+const PRELOADED = readPreloaded();
+
+// Domande incluse nel bundle, usate se index.html non contiene i dati precaricati
+const DEFAULT_SECTIONS = [
+  {
+    title: "Sintomi Principali",
+    description: "Valuta quanto spesso hai questi sintomi (da 0 = mai a 4 = sempre)",
+    questions: [
+      { id: 1, text: "I tuoi occhi ti sembrano secchi o irritati?", type: "scale" },
+      { id: 2, text: "Senti bruciore o pizzicore agli occhi?", type: "scale" },
+      { id: 3, text: "Hai sensazione di sabbia o corpo estraneo?", type: "scale" },
+      { id: 4, text: "Avverti fastidio alla luce (fotofobia)?", type: "scale" },
+      { id: 5, text: "La tua vista diventa offuscata nel corso della giornata?", type: "scale" },
+      { id: 6, text: "I tuoi occhi lacrimano spontaneamente?", type: "scale" },
+      { id: 7, text: "I sintomi peggiorano alla sera o dopo uso del computer?", type: "scale" }
+    ]
+  },
+  {
+    title: "Fattori Predisponenti",
+    description: "Rispondi Sì o No alle seguenti domande",
+    questions: [
+      { id: 8, text: "Usi frequentemente schermi (PC, tablet, smartphone)?", type: "yesno" },
+      { id: 9, text: "Indossi lenti a contatto?", type: "yesno" },
+      { id: 10, text: "Hai mai fatto un intervento agli occhi?", type: "yesno" },
+      { id: 11, text: "Hai una malattia autoimmune diagnosticata (es. Sjögren, lupus)?", type: "yesno" },
+      { id: 12, text: "Assumi farmaci per la pressione, depressione o antistaminici?", type: "yesno" }
+    ]
+  },
+  {
+    title: "Risposte ai Trattamenti",
+    description: "Indica se hai notato miglioramenti con questi trattamenti",
+    questions: [
+      { id: 13, text: "Noti miglioramento con lacrime artificiali?", type: "yesno" },
+      { id: 14, text: "Noti miglioramento dopo impacchi caldi?", type: "yesno" },
+      { id: 15, text: "I sintomi compaiono soprattutto al risveglio?", type: "yesno" },
+      { id: 16, text: "Hai provato lacrime più viscose o gel, con miglioramento?", type: "yesno" }
+    ]
+  },
+  {
+    title: "Diagnostica Riferita",
+    description: "Indica se conosci questi aspetti della tua condizione",
+    questions: [
+      { id: 17, text: "Ti hanno mai detto che hai un film lacrimale instabile?", type: "yesno" },
+      { id: 18, text: "Ti hanno mai fatto il test di Schirmer (carta sotto la palpebra)?", type: "yesno" },
+      { id: 19, text: "Sai se le tue ghiandole di Meibomio funzionano bene (MGD)?", type: "yesno" },
+      { id: 20, text: "I tuoi sintomi sono molto forti anche se all'esame l'occhio è 'normale'?", type: "yesno" }
+    ]
+  }
+];
+
+// Fisse per tutta la sessione: le domande non cambiano mentre il paziente risponde
+const sections = PRELOADED ? PRELOADED.questions.sections : DEFAULT_SECTIONS;
+
 function App() {
   const [currentSection, setCurrentSection] = useState(0);
   const [answers, setAnswers] = useState({});
   const [showResults, setShowResults] = useState(false);
   const [result, setResult] = useState(null);
 
-  const sections = [
-    {
-      title: "Sintomi Principali",
-      description: "Valuta quanto spesso hai questi sintomi (da 0 = mai a 4 = sempre)",
-      questions: [
-        { id: 1, text: "I tuoi occhi ti sembrano secchi o irritati?", type: "scale" },
-        { id: 2, text: "Senti bruciore o pizzicore agli occhi?", type: "scale" },
-        { id: 3, text: "Hai sensazione di sabbia o corpo estraneo?", type: "scale" },
-        { id: 4, text: "Avverti fastidio alla luce (fotofobia)?", type: "scale" },
-        { id: 5, text: "La tua vista diventa offuscata nel corso della giornata?", type: "scale" },
-        { id: 6, text: "I tuoi occhi lacrimano spontaneamente?", type: "scale" },
-        { id: 7, text: "I sintomi peggiorano alla sera o dopo uso del computer?", type: "scale" }
-      ]
-    },
-    {
-      title: "Fattori Predisponenti",
-      description: "Rispondi Sì o No alle seguenti domande",
-      questions: [
-        { id: 8, text: "Usi frequentemente schermi (PC, tablet, smartphone)?", type: "yesno" },
-        { id: 9, text: "Indossi lenti a contatto?", type: "yesno" },
-        { id: 10, text: "Hai mai fatto un intervento agli occhi?", type: "yesno" },
-        { id: 11, text: "Hai una malattia autoimmune diagnosticata (es. Sjögren, lupus)?", type: "yesno" },
-        { id: 12, text: "Assumi farmaci per la pressione, depressione o antistaminici?", type: "yesno" }
-      ]
-    },
-    {
-      title: "Risposte ai Trattamenti",
-      description: "Indica se hai notato miglioramenti con questi trattamenti",
-      questions: [
-        { id: 13, text: "Noti miglioramento con lacrime artificiali?", type: "yesno" },
-        { id: 14, text: "Noti miglioramento dopo impacchi caldi?", type: "yesno" },
-        { id: 15, text: "I sintomi compaiono soprattutto al risveglio?", type: "yesno" },
-        { id: 16, text: "Hai provato lacrime più viscose o gel, con miglioramento?", type: "yesno" }
-      ]
-    },
-    {
-      title: "Diagnostica Riferita",
-      description: "Indica se conosci questi aspetti della tua condizione",
-      questions: [
-        { id: 17, text: "Ti hanno mai detto che hai un film lacrimale instabile?", type: "yesno" },
-        { id: 18, text: "Ti hanno mai fatto il test di Schirmer (carta sotto la palpebra)?", type: "yesno" },
-        { id: 19, text: "Sai se le tue ghiandole di Meibomio funzionano bene (MGD)?", type: "yesno" },
-        { id: 20, text: "I tuoi sintomi sono molto forti anche se all'esame l'occhio è 'normale'?", type: "yesno" }
-      ]
-    }
-  ];
-
   const scaleLabels = ["Mai", "Raramente", "A volte", "Spesso", "Sempre"];
 
   const handleAnswer = (questionId, value) => {
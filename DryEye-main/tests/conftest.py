@@ -0,0 +1,35 @@
+import os
+import random
+
+import pytest
+
+# L'applicazione legge la configurazione all'import: i test non archiviano
+# le sottomissioni e non applicano rate limiting
+os.environ.setdefault("STORAGE_BACKEND", "none")
+os.environ.setdefault("ADMISSION_ENABLED", "0")
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient dell'applicazione con lifespan avviato"""
+    # Import qui: la configurazione sopra va impostata prima dell'import dell'applicazione
+    from fastapi.testclient import TestClient
+
+    from backend.app import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def answer_sets():
+    """Questionari completi casuali (seed fisso) che coprono tutti i rami della classificazione"""
+    rng = random.Random(1234)
+    sets = []
+    for _ in range(20000):
+        low, high = sorted((rng.randint(0, 4), rng.randint(0, 4)))
+        answers = {str(q): str(rng.randint(low, high)) for q in range(1, 8)}
+        yes_rate = rng.random()
+        answers.update({str(q): "si" if rng.random() < yes_rate else "no" for q in range(8, 21)})
+        sets.append(answers)
+    return sets
@@ -0,0 +1,85 @@
+"""
+Controllo di ammissione (backend/admission.py): token bucket e limite di
+concorrenza con coda limitata.
+"""
+import asyncio
+
+from backend.admission import AdmissionController, ConcurrencyLimiter, RateLimiter, RoutePolicy
+
+
+def test_token_bucket_burst_and_refill():
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter.check("a", 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.check("a", 0.0) == 0.5
+    # Le chiavi hanno bucket separati
+    assert limiter.check("b", 0.0) == 0.0
+    # Dopo mezzo secondo è disponibile un gettone
+    assert limiter.check("a", 0.5) == 0.0
+    assert limiter.rejected == 1
+
+
+def test_rate_limiter_bounds_keys():
+    limiter = RateLimiter(rate=1, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.check(key, 0.0)
+    assert limiter.stats()["keys"] == 2
+
+
+def test_concurrency_limiter_sheds_load():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=2, queue_size=1, timeout=1.0)
+
+        async def request(duration):
+            if not await limiter.acquire():
+                return "respinta"
+            try:
+                await asyncio.sleep(duration)
+                return "servita"
+            finally:
+                limiter.release()
+
+        results = await asyncio.gather(*(request(0.05) for _ in range(5)))
+        return results, limiter.stats()
+
+    results, stats = asyncio.run(scenario())
+    # 2 in esecuzione, 1 in coda (servita dopo), 2 respinte subito
+    assert sorted(results) == ["respinta", "respinta", "servita", "servita", "servita"]
+    assert stats["active"] == 0 and stats["waiting"] == 0 and stats["rejected"] == 2
+
+
+def test_concurrency_limiter_queue_timeout():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=4, timeout=0.05)
+        assert await limiter.acquire()
+        admitted = await limiter.acquire()
+        limiter.release()
+        return admitted, limiter.stats()
+
+    admitted, stats = asyncio.run(scenario())
+    assert not admitted
+    assert stats["timed_out"] == 1 and stats["active"] == 0
+
+
+def keyed_scope(ip, key=None):
+    headers = [(b"x-api-key", key.encode())] if key else []
+    return {"headers": headers, "client": (ip, 1)}
+
+
+def test_recognised_key_uses_only_its_own_bucket():
+    policy = RoutePolicy(ip_rate=1, ip_burst=1, key_rate=1, key_burst=3)
+    controller = AdmissionController({"/": policy}, 0, 0, 1.0, api_keys=frozenset({"clinica"}))
+    # Il bucket dell'IP condiviso (NAT) è esaurito da un client senza chiave
+    assert controller.check_rate(policy, keyed_scope("10.0.0.1")) == 0
+    assert controller.check_rate(policy, keyed_scope("10.0.0.1")) > 0
+    # La chiave riconosciuta ha la propria quota, indipendente dall'IP
+    assert [controller.check_rate(policy, keyed_scope("10.0.0.1", "clinica")) for _ in range(3)] == [0, 0, 0]
+    assert controller.check_rate(policy, keyed_scope("10.0.0.1", "clinica")) > 0
+    assert policy.ip.stats()["keys"] == 1 and policy.ip.rejected == 1
+
+
+def test_unknown_key_is_limited_by_ip():
+    policy = RoutePolicy(ip_rate=1, ip_burst=1, key_rate=1, key_burst=3)
+    controller = AdmissionController({"/": policy}, 0, 0, 1.0, api_keys=frozenset({"clinica"}))
+    assert controller.check_rate(policy, keyed_scope("10.0.0.2", "inventata")) == 0
+    assert controller.check_rate(policy, keyed_scope("10.0.0.2", "altra")) > 0
+    assert policy.key.stats()["keys"] == 0
@@ -0,0 +1,92 @@
+"""
+Statistiche aggregate con più worker (backend/aggregates.py): uno snapshot
+per slot, sommati in lettura.
+"""
+import asyncio
+import os
+import subprocess
+
+from backend.aggregates import AggregateStats, SnapshotTask, snapshot_task_from_env
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VECTOR = (2,) * 7 + (1,) * 13
+SCORES = {"evaporativeScore": 12, "aqueousScore": 12, "totalSymptoms": 14}
+
+
+def record(stats, count, result_type="Occhio Secco Misto"):
+    for _ in range(count):
+        stats.record(VECTOR, result_type, SCORES)
+
+
+def test_merged_sums_all_worker_slots(tmp_path):
+    template = str(tmp_path / "worker-{worker}.json")
+
+    async def scenario():
+        first, second = AggregateStats(), AggregateStats()
+        tasks = [SnapshotTask(first, template, "0"), SnapshotTask(second, template, "1")]
+        for task in tasks:
+            await task.start()
+        record(first, 3)
+        record(second, 2, "Occhio Secco Lieve")
+        await tasks[1].stop()
+        merged = await tasks[0].merged()
+        await tasks[0].stop()
+        return merged
+
+    merged = asyncio.run(scenario())
+    assert merged["workers"] == 2
+    assert merged["total"] == 5
+    assert merged["types"]["Occhio Secco Misto"] == 3
+    assert merged["types"]["Occhio Secco Lieve"] == 2
+    assert merged["answers"]["8"] == {"no": 0, "si": 5}
+
+
+def test_restarted_worker_resumes_its_slot(tmp_path):
+    template = str(tmp_path / "worker-{worker}.json")
+
+    async def run_worker(count):
+        stats = AggregateStats()
+        task = SnapshotTask(stats, template, "0")
+        await task.start()
+        record(stats, count)
+        await task.stop()
+        return stats.total
+
+    assert asyncio.run(run_worker(4)) == 4
+    # Stesso slot dopo il riciclo: i contatori continuano invece di ripartire da zero
+    assert asyncio.run(run_worker(1)) == 5
+    assert [p.name for p in tmp_path.iterdir()] == ["worker-0.json"]
+
+
+def entrypoint_snapshot_path():
+    """Percorso predefinito di AGGREGATES_SNAPSHOT_PATH come lo espande la shell di entrypoint.sh"""
+    with open(os.path.join(PROJECT_ROOT, "entrypoint.sh")) as f:
+        lines = [line.strip() for line in f if "AGGREGATES_SNAPSHOT_PATH=" in line]
+    assignment = lines[0].removeprefix("export ")
+    env = {key: value for key, value in os.environ.items() if key != "AGGREGATES_SNAPSHOT_PATH"}
+    script = f'{assignment}\nprintf %s "$AGGREGATES_SNAPSHOT_PATH"'
+    return subprocess.run(["sh", "-c", script], env=env, capture_output=True, text=True, check=True).stdout
+
+
+def test_entrypoint_default_gives_one_snapshot_per_slot(tmp_path, monkeypatch):
+    default = entrypoint_snapshot_path()
+    assert default.endswith("worker-{worker}.json")
+    monkeypatch.setenv("AGGREGATES_SNAPSHOT_PATH", str(tmp_path / os.path.basename(default)))
+
+    async def scenario():
+        tasks = []
+        for slot, count in (("0", 3), ("1", 2)):
+            monkeypatch.setenv("WORKER_SLOT", slot)
+            task = snapshot_task_from_env(AggregateStats())
+            await task.start()
+            record(task.stats, count)
+            tasks.append(task)
+        await tasks[1].stop()
+        merged = await tasks[0].merged()
+        await tasks[0].stop()
+        return tasks, merged
+
+    tasks, merged = asyncio.run(scenario())
+    assert tasks[0].path != tasks[1].path
+    assert (merged["workers"], merged["total"]) == (2, 5)
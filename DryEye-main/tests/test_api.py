@@ -0,0 +1,136 @@
+"""
+Comportamento degli endpoint di sottomissione (backend/server.py).
+"""
+import json
+
+import pytest
+
+from backend import server
+from backend.storage import StorageBusyError
+
+ANSWERS = {str(q): "2" for q in range(1, 8)}
+ANSWERS.update({str(q): "si" for q in range(8, 21)})
+
+
+class BusyAfter:
+    """Writer che accetta `accepted` record e poi segnala la coda piena"""
+
+    def __init__(self, accepted):
+        self.records = []
+        self.accepted = accepted
+
+    async def enqueue(self, record):
+        if len(self.records) >= self.accepted:
+            raise StorageBusyError("Coda di archiviazione piena")
+        self.records.append(record)
+
+
+def test_batch_reports_storage_busy_per_item(client, monkeypatch):
+    writer = BusyAfter(accepted=2)
+    monkeypatch.setattr(server, "submission_writer", writer)
+    response = client.post("/api/questionnaire/submit/batch", json=[{"answers": ANSWERS}] * 3)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert [item["error"] is None for item in body["results"]] == [True, True, False]
+    assert body["results"][2]["result"]["type"]
+    assert len(writer.records) == 2
+
+
+def test_html_submission_is_recorded_and_stored(client, monkeypatch):
+    writer = BusyAfter(accepted=1)
+    monkeypatch.setattr(server, "submission_writer", writer)
+    before = client.get("/api/questionnaire/stats").json()["total"]
+
+    response = client.post("/risultato", data=ANSWERS)
+    assert response.status_code == 200
+    assert client.get("/api/questionnaire/stats").json()["total"] == before + 1
+    assert len(writer.records) == 1
+    assert f"<strong>{writer.records[0]['type']}</strong>" in response.text
+
+    busy = client.post("/risultato", data=ANSWERS)
+    assert busy.status_code == 503 and busy.headers["retry-after"] == "1"
+
+
+def test_html_submission_ignores_non_ascii_digit_fields(client):
+    response = client.post("/risultato", data={**ANSWERS, "²": "1"})
+    assert response.status_code == 200
+    incomplete = client.post("/risultato", data={"²": "1", "1": "2"})
+    assert incomplete.status_code == 400
+
+
+def without(answers, key):
+    return {k: v for k, v in answers.items() if k != key}
+
+
+INVALID_ANSWERS = {
+    "missing": (without(ANSWERS, "7"), ("answers", "7"), "missing"),
+    "extra": ({**ANSWERS, "21": "si"}, ("answers", "21"), "extra_forbidden"),
+    "scale_out_of_range": ({**ANSWERS, "3": "5"}, ("answers", "3"), "literal_error"),
+    "scale_not_numeric": ({**ANSWERS, "3": "tre"}, ("answers", "3"), "literal_error"),
+    "yesno_not_si_no": ({**ANSWERS, "12": "forse"}, ("answers", "12"), "literal_error"),
+    "yesno_number": ({**ANSWERS, "12": "1"}, ("answers", "12"), "literal_error"),
+}
+
+
+@pytest.mark.parametrize("answers, loc, error_type", INVALID_ANSWERS.values(), ids=INVALID_ANSWERS)
+def test_submit_rejects_invalid_answers(client, answers, loc, error_type):
+    response = client.post("/api/questionnaire/submit", json={"answers": answers})
+    assert response.status_code == 400
+    (error,) = response.json()["detail"]
+    assert tuple(error["loc"]) == ("body", *loc)
+    assert error["type"] == error_type
+
+
+@pytest.mark.parametrize("answers, loc, error_type", INVALID_ANSWERS.values(), ids=INVALID_ANSWERS)
+def test_batch_rejects_invalid_item_only(client, answers, loc, error_type):
+    response = client.post("/api/questionnaire/submit/batch", json=[{"answers": ANSWERS}, {"answers": answers}])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    valid, invalid = body["results"]
+    assert valid["error"] is None and valid["result"]["type"]
+    assert invalid["result"] is None
+    assert invalid["error"].startswith(f"Risposte non valide: {'.'.join(loc)}:")
+
+
+def test_submit_rejects_malformed_body(client):
+    for body in (b"{", b"[]", b'{"answers": "tutte si"}'):
+        response = client.post("/api/questionnaire/submit", content=body,
+                               headers={"content-type": "application/json"})
+        assert response.status_code == 400
+
+
+def test_batch_rejects_non_list_body(client):
+    assert client.post("/api/questionnaire/submit/batch", content=b"{").status_code == 400
+    assert client.post("/api/questionnaire/submit/batch", json={"answers": ANSWERS}).status_code == 400
+
+
+def test_startup_time_metric(client):
+    pytest.importorskip("prometheus_client")
+    ready = client.get("/api/ready").json()
+    samples = [line for line in client.get("/metrics").text.splitlines()
+               if line.startswith("dry_eye_startup_seconds")]
+    assert len(samples) == 1
+    assert round(float(samples[0].split()[-1]), 3) == ready["startup_seconds"]
+
+
+def test_stream_classifies_each_line(client, monkeypatch):
+    monkeypatch.setattr(server, "MAX_STREAM_LINE_BYTES", 1024)
+    valid = json.dumps({"answers": ANSWERS}).encode()
+    oversized = json.dumps({"answers": ANSWERS, "note": "x" * 2000}).encode()
+    # Righe spezzate tra i blocchi, una riga vuota e l'ultima senza "\n"
+    body = b"\n".join([valid, b"{non json", b"", oversized, valid])
+    chunks = [body[i:i + 300] for i in range(0, len(body), 300)]
+    before = server.aggregate_stats.total
+
+    response = client.post("/api/questionnaire/submit/stream", content=iter(chunks),
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["index"] for item in items] == [0, 1, 2, 3]
+    assert items[0]["result"]["type"] == items[3]["result"]["type"] and items[0]["error"] is None
+    assert items[1]["result"] is None and items[1]["error"].startswith("Risposte non valide")
+    assert items[2] == {"index": 2, "result": None, "error": "Riga oltre 1024 byte."}
+    assert server.aggregate_stats.total == before + 2
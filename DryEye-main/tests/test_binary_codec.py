@@ -0,0 +1,97 @@
+"""
+Codifica binaria delle risposte e dei risultati (backend/binary_codec.py).
+"""
+import pytest
+
+from backend.binary_codec import (
+    ANSWERS_MEDIA_TYPE,
+    ERROR_INDEX,
+    RECORD_SIZE,
+    RESULT_MEDIA_TYPE,
+    decode_answers,
+    decode_record,
+    encode_error,
+    encode_result,
+    wants_binary_response,
+)
+from backend.rules import RESULT_TYPES
+from backend.server import classify_dry_eye, classify_vector
+
+RECORD = bytes([2] * 7 + [1] * 13)
+BINARY_HEADERS = {"Content-Type": ANSWERS_MEDIA_TYPE, "Accept": RESULT_MEDIA_TYPE}
+
+
+def test_decode_record():
+    assert decode_record(RECORD) == (2,) * 7 + (1,) * 13
+    assert decode_record(bytes([4] * 7 + [0] * 13)) == (4,) * 7 + (0,) * 13
+
+
+@pytest.mark.parametrize("position, value", [(0, 5), (6, 255), (7, 2), (19, 4)])
+def test_decode_record_rejects_out_of_range(position, value):
+    record = bytearray(RECORD)
+    record[position] = value
+    assert decode_record(bytes(record)) is None
+
+
+def test_decode_answers_requires_whole_records():
+    assert decode_answers(RECORD * 3) == [decode_record(RECORD)] * 3
+    assert len(RECORD) == RECORD_SIZE
+    for body in (b"", RECORD[:-1], RECORD + b"\x00"):
+        with pytest.raises(ValueError):
+            decode_answers(body)
+
+
+def test_encode_result():
+    answers = {str(q): "2" for q in range(1, 8)}
+    answers.update({str(q): "si" for q in range(8, 21)})
+    result = classify_dry_eye(answers)
+    encoded = encode_result(result)
+    assert len(encoded) == 4
+    assert RESULT_TYPES[encoded[0]] == result.type
+    assert list(encoded[1:]) == [result.scores["evaporativeScore"], result.scores["aqueousScore"],
+                                 result.scores["totalSymptoms"]]
+    assert encode_error() == bytes([ERROR_INDEX, 0, 0, 0])
+
+
+@pytest.mark.parametrize("accept, binary", [
+    (None, False),
+    ("application/json", False),
+    ("*/*", False),
+    (RESULT_MEDIA_TYPE, True),
+    (f"{RESULT_MEDIA_TYPE};q=0", False),
+    (f"{RESULT_MEDIA_TYPE}; q=0.0, application/json", False),
+    (f"application/json, {RESULT_MEDIA_TYPE};q=0.5", False),
+    (f"application/json;q=0.5, {RESULT_MEDIA_TYPE}", True),
+    (f"{RESULT_MEDIA_TYPE}, */*;q=0.1", True),
+    (f"{RESULT_MEDIA_TYPE}, */*", True),
+    (f"{RESULT_MEDIA_TYPE}+json", False),
+    (RESULT_MEDIA_TYPE.upper(), True),
+])
+def test_wants_binary_response(accept, binary):
+    assert wants_binary_response(accept) is binary
+
+
+def test_submit_binary(client):
+    response = client.post("/api/questionnaire/submit", content=RECORD, headers=BINARY_HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == RESULT_MEDIA_TYPE
+    assert response.content == encode_result(classify_vector(decode_record(RECORD)))
+
+    json_response = client.post("/api/questionnaire/submit", content=RECORD,
+                                headers={**BINARY_HEADERS, "Accept": f"{RESULT_MEDIA_TYPE};q=0"})
+    assert json_response.json()["type"] == classify_vector(decode_record(RECORD)).type
+
+
+def test_submit_binary_rejects_invalid_records(client):
+    assert client.post("/api/questionnaire/submit", content=RECORD * 2, headers=BINARY_HEADERS).status_code == 400
+    invalid = bytes([5]) + RECORD[1:]
+    assert client.post("/api/questionnaire/submit", content=invalid, headers=BINARY_HEADERS).status_code == 400
+
+
+def test_batch_binary_marks_invalid_records(client):
+    invalid = bytes([9]) + RECORD[1:]
+    response = client.post("/api/questionnaire/submit/batch", content=RECORD + invalid + RECORD,
+                           headers=BINARY_HEADERS)
+    assert response.status_code == 200
+    expected = encode_result(classify_vector(decode_record(RECORD)))
+    assert response.content == expected + encode_error() + expected
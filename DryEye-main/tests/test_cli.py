@@ -0,0 +1,40 @@
+"""
+Punteggio offline da riga di comando (backend/cli.py).
+"""
+import csv
+
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from backend.cli import app, check_columns
+
+ROW = ["2"] * 7 + ["si"] * 13
+
+
+def write_csv(path, header, row):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerow(row)
+
+
+def test_missing_answer_columns_fail_fast(tmp_path):
+    source, output = tmp_path / "export.csv", tmp_path / "risultati.csv"
+    write_csv(source, [str(q) for q in range(1, 19)], ROW[:18])
+    with pytest.raises(typer.BadParameter, match=r": 19, 20 "):
+        check_columns(str(source), [str(q) for q in range(1, 21)])
+    result = CliRunner().invoke(app, [str(source), "--output", str(output), "--workers", "1"])
+    assert result.exit_code == 2
+    assert not output.exists()
+
+
+def test_column_prefix(tmp_path):
+    source, output = tmp_path / "export.csv", tmp_path / "risultati.csv"
+    write_csv(source, [f"q{q}" for q in range(1, 21)], ROW)
+    assert CliRunner().invoke(app, [str(source), "-o", str(output), "--workers", "1"]).exit_code == 2
+    result = CliRunner().invoke(app, [str(source), "-o", str(output), "--workers", "1", "--column-prefix", "q"])
+    assert result.exit_code == 0
+    with open(output) as f:
+        (row,) = list(csv.DictReader(f))
+    assert row["type"] == "Occhio Secco Misto" and row["error"] == ""
@@ -0,0 +1,49 @@
+"""
+FastJSONResponse (backend/fast_json.py) deve produrre lo stesso JSON della
+JSONResponse di FastAPI/Starlette che ha sostituito.
+"""
+import json
+
+import numpy as np
+import pytest
+from starlette.responses import JSONResponse
+
+from backend import fast_json
+from backend.fast_json import FastJSONResponse
+
+ANSWERS = {str(q): "3" for q in range(1, 8)}
+ANSWERS.update({str(q): "si" for q in range(8, 21)})
+
+CONTENT = {
+    "testo": "Il tuo profilo è compatibile con un occhio secco: più lacrime, umidità",
+    "float": [0.1, 0.1 + 0.2, 1e-7, 12345.678, -0.0],
+    "numpy": np.float64(0.25),
+    "annidato": {"lista": [1, "due", None, True]},
+}
+
+
+@pytest.mark.parametrize("orjson", [fast_json.orjson, None], ids=["orjson", "pydantic_core"])
+def test_render_matches_json_response(monkeypatch, orjson):
+    monkeypatch.setattr(fast_json, "orjson", orjson)
+    fast, default = FastJSONResponse(CONTENT), JSONResponse(CONTENT)
+    assert json.loads(fast.body) == json.loads(default.body)
+    assert fast.headers["content-type"] == default.headers["content-type"]
+    # Testi italiani in UTF-8, non come sequenze \u
+    assert "è compatibile".encode() in fast.body
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("POST", "/api/questionnaire/submit", {"answers": ANSWERS}),
+    ("POST", "/api/questionnaire/submit/batch", [{"answers": ANSWERS}] * 3),
+    ("GET", "/api/questionnaire/stats", None),
+    ("GET", "/api/ready", None),
+], ids=["submit", "batch", "stats", "ready"])
+def test_routes_match_default_serialization(client, monkeypatch, method, path, body):
+    responses = []
+    for enabled in (True, False):
+        monkeypatch.setattr(fast_json, "ENABLED", enabled)
+        responses.append(client.request(method, path, json=body))
+    fast, default = responses
+    assert fast.status_code == default.status_code == 200
+    assert fast.headers["content-type"] == default.headers["content-type"] == "application/json"
+    assert fast.json() == default.json()
@@ -0,0 +1,49 @@
+"""
+Tempo di import di backend.app, misurato con `python -X importtime` in un
+processo separato (è il costo di ogni avvio a freddo).
+
+Il budget si regola con IMPORT_TIME_BUDGET_MS; con -s viene stampato il
+rapporto dei moduli più lenti.
+"""
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# Pacchetti pesanti che il server non deve importare all'avvio
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "pymongo", "typer")
+
+
+def import_report(module: str = "backend.app"):
+    """(modulo, self µs, cumulativo µs) per ogni import, più l'elenco dei moduli caricati"""
+    env = {**os.environ, "STORAGE_BACKEND": "none"}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys, {module}; print(' '.join(sys.modules))"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows, set(process.stdout.split())
+
+
+def test_backend_import_time():
+    rows, loaded = import_report()
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+
+    print(f"\nimport backend.app: {total_ms:.1f}ms (budget {IMPORT_TIME_BUDGET_MS:.0f}ms)")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[1], reverse=True)[:15]:
+        print(f"{self_us / 1000:>9.1f}ms  {cumulative_us / 1000:>9.1f}ms  {name}")
+
+    assert not loaded & set(HEAVY_MODULES), f"import pesanti all'avvio: {sorted(loaded & set(HEAVY_MODULES))}"
+    assert total_ms < IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,41 @@
+"""
+Tabella precalcolata dei risultati (backend/lookup_table.py).
+"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend import server
+from backend.lookup_table import LookupTable
+
+
+@pytest.fixture(scope="module")
+def table_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("lookup") / "table.bin"
+    # Più worker che all'avvio non trovano la tabella: uno la scrive, gli altri la mappano
+    with ThreadPoolExecutor(4) as pool:
+        tables = list(pool.map(LookupTable.from_config, [str(path)] * 4))
+    assert sorted(table.source.split(":")[0] for table in tables) == ["built+mmap", "mmap", "mmap", "mmap"]
+    return path
+
+
+def test_concurrent_builds_leave_a_single_valid_file(table_path):
+    assert sorted(p.name for p in table_path.parent.iterdir()) == ["table.bin", "table.bin.lock"]
+    assert LookupTable.load(str(table_path)).report()["memory_mapped"]
+
+
+def test_lookup_matches_classify_vector(table_path):
+    table = LookupTable.load(str(table_path))
+    rng = random.Random(42)
+    for _ in range(50000):
+        vector = tuple(rng.randint(0, 4) for _ in range(7)) + tuple(rng.randint(0, 1) for _ in range(13))
+        assert server._build_result(*table.lookup_vector(vector)) == server.classify_vector(vector)
+
+
+def test_truncated_table_is_rebuilt(table_path, tmp_path):
+    path = tmp_path / "table.bin"
+    path.write_bytes(table_path.read_bytes()[:1000])
+    with pytest.raises(ValueError, match="dimensione"):
+        LookupTable.load(str(path))
+    assert LookupTable.from_config(str(path)).source == f"built+mmap:{path}"
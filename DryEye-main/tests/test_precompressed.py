@@ -0,0 +1,33 @@
+"""
+ETag e revalidazione delle risposte statiche (backend/precompressed.py).
+"""
+import pytest
+
+from backend.precompressed import ENCODINGS
+
+QUESTIONS = "/api/questionnaire/questions"
+
+
+def fetch(client, encoding, if_none_match=None):
+    headers = {"Accept-Encoding": encoding or "identity"}
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
+    return client.get(QUESTIONS, headers=headers)
+
+
+def test_each_encoding_has_its_own_strong_etag(client):
+    etags = {encoding: fetch(client, encoding).headers["etag"] for encoding in (None, *ENCODINGS)}
+    assert len(set(etags.values())) == len(etags)
+    assert not any(etag.startswith("W/") for etag in etags.values())
+
+
+@pytest.mark.parametrize("encoding", [None, *ENCODINGS])
+def test_revalidation_matches_only_the_selected_encoding(client, encoding):
+    etag = fetch(client, encoding).headers["etag"]
+    response = fetch(client, encoding, etag)
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert fetch(client, encoding, f"W/{etag}").status_code == 304
+
+    other = "gzip" if encoding is None else None
+    assert fetch(client, other, etag).status_code == 200
@@ -0,0 +1,72 @@
+"""
+Cache LRU dei risultati e chiave delle risposte (backend/result_cache.py).
+"""
+import random
+
+from backend import server
+from backend.result_cache import ResultCache, pack_vector
+from backend.rules import referenced_questions
+
+
+def test_counters_and_lru_eviction_order():
+    cache = ResultCache(2)
+    computed = []
+
+    def compute(key):
+        computed.append(key)
+        return f"risultato {key}"
+
+    assert cache.get_or_compute_key(1, compute, 1) == "risultato 1"
+    cache.get_or_compute_key(2, compute, 2)
+    assert cache.get_or_compute_key(1, compute, 1) == "risultato 1"   # hit: 1 diventa il più recente
+    cache.get_or_compute_key(3, compute, 3)                            # evict 2, il meno recente
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 3, "evictions": 1}
+
+    cache.get_or_compute_key(1, compute, 1)
+    cache.get_or_compute_key(2, compute, 2)
+    assert computed == [1, 2, 3, 2]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_put_refreshes_recency():
+    cache = ResultCache(2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    cache.put(1, "a")
+    cache.put(3, "c")
+    assert cache.get_or_compute_key(1, lambda: "ricalcolato") == "a"
+    assert cache.get_or_compute_key(2, lambda: "ricalcolato") == "ricalcolato"
+
+
+def test_disabled_cache_always_computes():
+    cache = ResultCache(0)
+    cache.put(1, "a")
+    assert cache.get_or_compute_key(1, lambda: "b") == "b"
+    assert cache.stats() == {"size": 0, "maxsize": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+
+def test_pack_vector_is_injective_on_relevant_answers():
+    scale, yesno = referenced_questions()
+    relevant = [q - 1 for q in (*scale, *yesno)]
+    rng = random.Random(7)
+    keys = {}
+    for _ in range(200000):
+        vector = tuple(rng.randint(0, 4) for _ in range(7)) + tuple(rng.randint(0, 1) for _ in range(13))
+        projection = tuple(vector[i] for i in relevant)
+        # Stessa chiave se e solo se le risposte rilevanti coincidono
+        assert keys.setdefault(pack_vector(vector), projection) == projection
+    assert len(keys) == len(set(keys.values()))
+
+
+def test_same_key_gives_same_result():
+    base = (4, 0, 4, 0, 4, 0, 4) + (1, 0) * 6 + (1,)
+    scale, yesno = referenced_questions()
+    for q in range(1, 21):
+        other = list(base)
+        other[q - 1] = 0 if base[q - 1] else 1
+        other = tuple(other)
+        if q in scale or q in yesno:
+            assert pack_vector(other) != pack_vector(base)
+        else:
+            assert pack_vector(other) == pack_vector(base)
+            assert server.classify_vector(other) == server.classify_vector(base)
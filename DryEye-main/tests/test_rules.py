@@ -0,0 +1,127 @@
+"""
+Lo scorer generato da backend/rules.py (compile_scorer, compile_vector_scorer)
+deve coincidere con l'algoritmo scritto a mano che ha sostituito; le tabelle
+delle regole e i modelli dei risultati sono immutabili.
+"""
+import pytest
+from pydantic import ValidationError
+
+from backend import server
+from backend.answers import answers_to_vector
+from backend.rules import (
+    CLASSIFICATION_RULES,
+    RESULT_DEFINITIONS,
+    RESULT_TYPES,
+    SCORE_WEIGHTS,
+    compile_scorer,
+    compile_vector_scorer,
+    validate_rules,
+)
+
+score_answers = compile_scorer()
+score_vector = compile_vector_scorer()
+
+
+def reference_classify(answers):
+    """Algoritmo originale di classify_dry_eye, prima delle tabelle in rules.py"""
+    evaporative = sum(int(answers.get(str(q), "0")) for q in (2, 3, 5, 7))
+    evaporative += sum(2 if answers.get(str(q)) == "si" else 0 for q in (14, 19))
+    aqueous = sum(int(answers.get(str(q), "0")) for q in (1, 6))
+    aqueous += sum(2 if answers.get(str(q)) == "si" else 0 for q in (15, 16, 11, 18))
+    total = sum(int(answers.get(str(q), "0")) for q in range(1, 8))
+
+    if answers.get("20") == "si" and total >= 15:
+        result_type = "Occhio Secco Neuropatico"
+    elif evaporative >= 12 and aqueous >= 10:
+        result_type = "Occhio Secco Misto"
+    elif evaporative > aqueous and evaporative >= 8:
+        result_type = "Occhio Secco Evaporativo"
+    elif aqueous >= 8:
+        result_type = "Occhio Secco da Deficit Acquoso"
+    else:
+        result_type = "Occhio Secco Lieve"
+    return result_type, (evaporative, aqueous, total)
+
+
+def answers(scale, yes=(), **overrides):
+    """Questionario con le risposte scala 1-7 date e "si" alle domande in `yes`"""
+    result = {str(q): str(value) for q, value in zip(range(1, 8), scale)}
+    result.update({str(q): "si" if q in yes else "no" for q in range(8, 21)})
+    result.update(overrides)
+    return result
+
+
+def generated(answer_set):
+    index, scores = score_answers(answer_set)
+    vector_index, vector_scores = score_vector(answers_to_vector(answer_set))
+    assert (vector_index, vector_scores) == (index, scores)
+    return RESULT_TYPES[index], tuple(scores[:3])
+
+
+# (risposte, tipo atteso): ogni soglia è verificata sul valore limite e subito sotto
+EDGES = [
+    # Neuropatico: totale sintomi 15 / 14 con la domanda 20 positiva
+    (answers((3, 3, 3, 3, 3, 0, 0), yes=(20,)), "Occhio Secco Neuropatico"),
+    (answers((3, 3, 3, 3, 2, 0, 0), yes=(20,)), "Occhio Secco Evaporativo"),
+    (answers((3, 3, 3, 3, 3, 0, 0)), "Occhio Secco Evaporativo"),
+    # Misto: evaporativo 12 e acquoso 10, poi 11/10 e 12/9
+    (answers((1, 4, 4, 0, 0, 1, 0), yes=(14, 19, 15, 16, 11, 18)), "Occhio Secco Misto"),
+    (answers((1, 4, 3, 0, 0, 1, 0), yes=(14, 19, 15, 16, 11, 18)), "Occhio Secco Evaporativo"),
+    (answers((0, 4, 4, 0, 0, 1, 0), yes=(14, 19, 15, 16, 11, 18)), "Occhio Secco Evaporativo"),
+    # Evaporativo: 8 oltre l'acquoso, poi 7, poi 8 pari all'acquoso
+    (answers((0, 4, 4, 0, 0, 0, 0)), "Occhio Secco Evaporativo"),
+    (answers((0, 4, 3, 0, 0, 0, 0)), "Occhio Secco Lieve"),
+    (answers((4, 4, 4, 0, 0, 4, 0)), "Occhio Secco da Deficit Acquoso"),
+    # Deficit acquoso: 8, poi 7
+    (answers((4, 0, 0, 0, 0, 4, 0)), "Occhio Secco da Deficit Acquoso"),
+    (answers((4, 0, 0, 0, 0, 3, 0)), "Occhio Secco Lieve"),
+    (answers((0,) * 7), "Occhio Secco Lieve"),
+]
+
+
+@pytest.mark.parametrize("answer_set, expected", EDGES)
+def test_threshold_edges(answer_set, expected):
+    assert reference_classify(answer_set)[0] == expected
+    assert generated(answer_set) == reference_classify(answer_set)
+
+
+def test_matches_reference_algorithm(answer_sets):
+    results = [generated(answer_set) for answer_set in answer_sets]
+    assert results == [reference_classify(answer_set) for answer_set in answer_sets]
+    assert {result_type for result_type, _ in results} == set(RESULT_TYPES)
+
+
+def test_missing_answers_default_to_zero_and_no():
+    for answer_set in ({}, {"20": "si", "1": "4"}, {"14": "si"}):
+        assert score_answers(answer_set)[1][:3] == reference_classify(answer_set)[1]
+        assert RESULT_TYPES[score_answers(answer_set)[0]] == reference_classify(answer_set)[0]
+
+
+def test_rule_tables_are_read_only():
+    with pytest.raises(TypeError):
+        SCORE_WEIGHTS["evaporativeScore"][2] = 5
+    with pytest.raises(TypeError):
+        RESULT_DEFINITIONS["mild"]["type"] = "Altro"
+    assert isinstance(CLASSIFICATION_RULES, tuple)
+    assert all(isinstance(d["recommendations"], tuple) for d in RESULT_DEFINITIONS.values())
+
+
+@pytest.mark.parametrize("rules, message", [
+    (CLASSIFICATION_RULES[:-1], "senza condizioni"),
+    ((("mixed", (("evaporativeScore", "<", 1),)), ("mild", ())), "Condizione non valida"),
+    ((("mixed", (("evaporativeScore", ">", "altroScore"),)), ("mild", ())), "Punteggio sconosciuto"),
+    ((("nuovo", ()),), "Definizione del risultato"),
+])
+def test_validate_rules_rejects_inconsistent_tables(rules, message):
+    with pytest.raises(ValueError, match=message):
+        validate_rules(SCORE_WEIGHTS, rules, RESULT_DEFINITIONS)
+
+
+def test_results_share_the_frozen_templates():
+    first = server.classify_dry_eye(answers((0,) * 7))
+    second = server.classify_dry_eye(answers((1,) * 7))
+    assert first.type == second.type == "Occhio Secco Lieve"
+    assert first.recommendations is second.recommendations
+    assert first.scores is not second.scores
+    with pytest.raises(ValidationError):
+        first.type = "Altro"
@@ -0,0 +1,68 @@
+"""
+Cache condivisa (backend/shared_cache.py) con il sostituto in memoria di
+Redis; con REDIS_TEST_URL gli stessi test girano contro un Redis reale.
+"""
+import os
+import time
+
+import pytest
+
+from backend.shared_cache import MemoryRedis, SharedCache
+
+
+@pytest.fixture
+def client():
+    url = os.environ.get("REDIS_TEST_URL")
+    if not url:
+        return MemoryRedis()
+    redis = pytest.importorskip("redis")
+    client = redis.Redis.from_url(url)
+    client.flushdb()
+    return client
+
+
+def test_results_round_trip(client):
+    writer = SharedCache(client, batch_size=2)
+    writer.write_results([(1, b"\x00\x01\x02\x03"), (2, b"\x01\x02\x03\x04"), (3, b"\x02\x00\x00\x00")])
+    assert writer.written == 3
+
+    reader = SharedCache(client, batch_size=2)
+    assert sorted(reader.load_results(limit=10)) == [
+        (1, b"\x00\x01\x02\x03"), (2, b"\x01\x02\x03\x04"), (3, b"\x02\x00\x00\x00")
+    ]
+    assert len(reader.load_results(limit=2)) == 2
+
+
+def test_payload_variants(client):
+    cache = SharedCache(client)
+    assert cache.load_variants('"abc"', ("gzip", "br")) is None
+    cache.store_variants('"abc"', {"gzip": b"g"})
+    assert cache.load_variants('"abc"', ("gzip", "br")) is None
+    assert cache.load_variants('"abc"', ("gzip",)) == {"gzip": b"g"}
+
+
+def test_ttl_expiry():
+    client = MemoryRedis()
+    cache = SharedCache(client, ttl=0.05)
+    cache.write_results([(7, b"\x00\x00\x00\x00")])
+    time.sleep(0.1)
+    assert cache.load_results(limit=10) == []
+
+
+class _Unreachable:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("Redis non raggiungibile")
+        return fail
+
+
+def test_falls_back_to_local_only():
+    cache = SharedCache(_Unreachable(), retry_interval=60)
+    cache.write_results([(1, b"\x00\x00\x00\x00")])
+    assert not cache.available
+    assert cache.errors == 1 and cache.dropped == 1
+
+    # In pausa non viene tentata alcuna operazione
+    assert cache.load_results(limit=10) == []
+    assert cache.load_variants('"x"', ("gzip",)) is None
+    assert cache.errors == 1
@@ -0,0 +1,51 @@
+"""
+Scrittura a lotti delle sottomissioni (backend/storage.py).
+"""
+import asyncio
+
+from backend.storage import SubmissionWriter
+
+
+class ListBackend:
+    def __init__(self):
+        self.rows = []
+        self.closed = False
+
+    def write_batch(self, records):
+        self.rows.extend(records)
+
+    def close(self):
+        self.closed = True
+
+
+def test_stop_writes_batch_in_progress():
+    async def scenario():
+        backend = ListBackend()
+        writer = SubmissionWriter(backend, batch_size=100, flush_interval=5)
+        await writer.start()
+        for i in range(3):
+            await writer.enqueue({"id": i})
+        # Il task ha già preso i record dalla coda e sta attendendo il resto del lotto
+        await asyncio.sleep(0)
+        await writer.stop()
+        return backend, writer.stats()
+
+    backend, stats = asyncio.run(scenario())
+    assert [row["id"] for row in backend.rows] == [0, 1, 2]
+    assert stats["written"] == 3 and stats["failed"] == 0
+    assert backend.closed
+
+
+def test_stop_writes_records_queued_after_full_batches():
+    async def scenario():
+        backend = ListBackend()
+        writer = SubmissionWriter(backend, batch_size=2, flush_interval=5)
+        await writer.start()
+        for i in range(5):
+            await writer.enqueue({"id": i})
+        await writer.stop()
+        return backend, writer.stats()
+
+    backend, stats = asyncio.run(scenario())
+    assert sorted(row["id"] for row in backend.rows) == [0, 1, 2, 3, 4]
+    assert stats["written"] == 5
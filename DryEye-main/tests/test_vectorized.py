@@ -0,0 +1,29 @@
+"""
+Il motore vettoriale (backend/vectorized.py) deve dare esattamente gli
+stessi risultati di classify_dry_eye.
+"""
+import numpy as np
+
+from backend.rules import PUBLIC_SCORES, RESULT_TYPES
+from backend.server import classify_dry_eye
+from backend.vectorized import encode_answers, iter_results, score_matrix
+
+
+def test_iter_results_matches_classify_dry_eye(answer_sets):
+    expected = [classify_dry_eye(answers) for answers in answer_sets]
+    assert {result.type for result in expected} == set(RESULT_TYPES)
+    for (result_type, scores), result in zip(iter_results(answer_sets), expected):
+        assert (result_type, scores) == (result.type, result.scores)
+
+
+def test_score_matrix_matches_classify_dry_eye(answer_sets):
+    evaporative, aqueous, total, type_index = score_matrix(encode_answers(answer_sets))
+    expected = [classify_dry_eye(answers) for answers in answer_sets]
+    assert np.asarray(RESULT_TYPES)[type_index].tolist() == [result.type for result in expected]
+    for name, column in zip(PUBLIC_SCORES, (evaporative, aqueous, total)):
+        assert column.tolist() == [result.scores[name] for result in expected]
+
+
+def test_missing_answers_default_like_classify_dry_eye():
+    partial = [{}, {"1": "4", "20": "si"}, {"2": "3", "14": "si", "19": "no"}]
+    assert list(iter_results(partial)) == [(r.type, r.scores) for r in map(classify_dry_eye, partial)]